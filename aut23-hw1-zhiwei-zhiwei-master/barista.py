@@ -1,4 +1,163 @@
-from typing import List, Tuple
+import heapq
+import sys
+from collections import Counter
+from itertools import compress, count as counter, islice, repeat
+from math import isqrt
+from operator import mul, truediv
+from typing import Iterator, List, Optional, Set, Tuple
+
+# Once a bracket spans at most this many drinks, the drinks inside it are
+# listed and swept instead of narrowing the bracket further.
+SWEEP_DRINKS = 1 << 14
+
+
+def time_counts(times: List[int]) -> List[Tuple[int, int]]:
+    """
+    Collapses the barista service times into (time, number of baristas) pairs.
+
+    Parameters
+    ----------
+    times : List[int]
+        A list of the time it takes each barista to prepare a drink.
+
+    Returns
+    -------
+    List[Tuple[int, int]]
+        The distinct service times together with their multiplicities.
+    """
+    return list(Counter(times).items())
+
+
+def total_drinks_served(t: int, counts: List[Tuple[int, int]]) -> int:
+    """
+    Returns how many drinks have been finished by time `t` (inclusive).
+
+    Parameters
+    ----------
+    t : int
+        The point in time.
+    counts : List[Tuple[int, int]]
+        The (time, number of baristas) pairs returned by `time_counts`.
+
+    Returns
+    -------
+    int
+        The number of drinks that are ready at or before `t`.
+    """
+    return sum(count * (t // time) for time, count in counts)
+
+
+def first_full_time(K: int, N: int, counts: List[Tuple[int, int]]) -> int:
+    """
+    Returns the earliest time at which at least `K` customers have been handed
+    to a barista.
+
+    Every barista takes a new customer at each multiple of their service time,
+    so by time `t` exactly `total_drinks_served(t) + N` customers have started.
+    That count is monotone in `t`, which lets us search on the time instead of
+    simulating the queue.
+
+    Parameters
+    ----------
+    K : int
+        Your position in the queue.
+    N : int
+        The number of baristas.
+    counts : List[Tuple[int, int]]
+        The (time, number of baristas) pairs returned by `time_counts`.
+
+    Returns
+    -------
+    int
+        The smallest `T` with `total_drinks_served(T) + N >= K`.
+    """
+    times = [time for time, _ in counts]
+    return _search(K, N, times, [count for _, count in counts])[0]
+
+
+def _search(K: int, N: int, times: List[int], multiplicities: Optional[List[int]]) -> Tuple[int, int, Set[int]]:
+    """
+    `first_full_time` over parallel lists of service times and how many
+    baristas have each (None if one each, duplicates allowed).
+
+    The drinks served by `t` lie in (t * rate - N, t * rate]: a straight line
+    minus a staircase of at most N. Newton steps on the line, overshooting by
+    a few standard deviations of the staircase, bracket the answer to a few
+    hundred drinks in two or three passes over the roster. The drinks that
+    end inside the bracket are then listed and swept in order, which pins the
+    exact answer down in one more pass.
+
+    Returns
+    -------
+    Tuple[int, int, Set[int]]
+        The start time, how many customers started strictly before it, and
+        the service times of the baristas that take a customer at it.
+    """
+    if K <= N:
+        return 0, 0, set(times)
+    target = K - N  # drinks that have to be served
+
+    def served(t: int) -> int:
+        # `total_drinks_served`, with map() over bound methods keeping the
+        # loop in C.
+        if multiplicities is None:
+            return sum(map(t.__floordiv__, times))
+        return sum(map(mul, map(t.__floordiv__, times), multiplicities))
+
+    if multiplicities is None:
+        rate = sum(map(truediv, repeat(1), times))
+    else:
+        rate = sum(map(truediv, multiplicities, times))
+    # On average every barista is halfway through a drink.
+    t = int((target + N / 2) / rate)
+    low = high = None
+    low_served = high_served = 0
+    margin, bisect = 1, False
+    while True:
+        drinks = served(t)
+        width = high - low if low is not None and high is not None else None
+        if drinks >= target:
+            high, high_served = t, drinks
+        else:
+            low, low_served = t, drinks
+        if low is not None and high is not None:
+            if high_served - low_served <= SWEEP_DRINKS or high - low <= 1:
+                break
+            # Bisect whenever a step failed to halve the bracket, which keeps
+            # the worst case logarithmic.
+            bisect = width is not None and not bisect and 2 * (high - low) > width
+        # Aim past the line's root by a few standard deviations of the
+        # staircase, so that the next point lands on the far side.
+        miss = target - drinks
+        spread = 3 * isqrt(abs(miss)) + margin
+        if miss > 0:
+            t += int((miss + spread) / rate) + 1
+        else:
+            t -= int((spread - miss) / rate) + 1
+        if low is None or high is None:
+            # Still one-sided: widen the overshoot until the far side turns up.
+            margin *= 2
+            t = max(t, 0)
+        elif bisect or not low < t < high:
+            t = (low + high) // 2
+
+    # Every drink served in (low, high] ends at a multiple of some service
+    # time; list those ends and walk them in order up to the target. A time
+    # has such a multiple exactly when high % time < high - low.
+    width = high - low
+    pairs = zip(times, repeat(1) if multiplicities is None else multiplicities)
+    ends = []
+    for time, count in compress(pairs, map(width.__gt__, map(high.__mod__, times))):
+        ends.extend((k * time, time, count) for k in range(low // time + 1, high // time + 1))
+    ends.sort()
+    drinks = low_served
+    for i, (end, _, count) in enumerate(ends):
+        if i == 0 or end != ends[i - 1][0]:
+            start, before = end, drinks
+        drinks += count
+        if drinks >= target:
+            return start, before + N, {time for end, time, _ in ends if end == start}
+    raise AssertionError("unreachable: the bracket holds the answer")
 
 
 def solve(N: int, K: int, times: List[int]) -> Tuple[int, int]:
@@ -22,58 +181,67 @@ def solve(N: int, K: int, times: List[int]) -> Tuple[int, int]:
         Two integers, the number of the barista who will prepare your drink and
         the time that it will be ready
     """
+    if 2 * len(set(times)) > N:
+        # Mostly distinct times: collapsing them would cost more than it saves.
+        start, before, ending = _search(K, N, times, None)
+    else:
+        counts = time_counts(times)
+        start, before, ending = _search(K, N, [time for time, _ in counts], [count for _, count in counts])
+    # Customers that started strictly before `start` take the earlier slots;
+    # the rest are handed out at `start` in order of barista number.
+    free = compress(counter(1), map(ending.__contains__, times))
+    for barista in islice(free, K - before - 1, None):
+        return barista, start + times[barista - 1]
+    raise AssertionError("unreachable: no barista free at the start time")
+
+
+def iter_schedule(times: List[int], start: int = 1) -> Iterator[Tuple[int, int, int]]:
+    """
+    Lazily yields the queue from position `start` onwards, one customer at a
+    time, without materializing the customers ahead of it.
 
-    # TODO: Your code here.
-    # https://chat.openai.com/share/b78f13b3-e1e8-4bbe-a5e4-89fcb6b0b91f
-    def gcd(a: int, b: int) -> int:
-        while b:
-            a, b = b, a % b
-        return a
-
-    def lcm(a: int, b: int) -> int:
-        return abs(a * b) // gcd(a, b)
-
-    def lcm_list(numbers: List[int]) -> int:
-        result = 1
-        for num in numbers:
-            result = lcm(result, num)
-        return result
-
-    def total_drinks_served(t: int, times: List[int]) -> int:
-        a = sum((t // time) for time in times)
-        return a
-
-    max_num = lcm_list(times)  # find the lcm
-    sum_customer = total_drinks_served(max_num, times)  # base on the lcm number, find sum of customer it can serve
-    # print(max_num)
-    # print(sum_customer)
-    iteration_times = K // sum_customer  # time of iteration
-    rest_customer = K - iteration_times * sum_customer  # the rest of customer
-
-    if rest_customer == 0:
-        if len(set(times)) == 1:
-            return len(times), iteration_times * max_num
-        return 1, iteration_times * max_num
-    # print(iteration_times)
-    # print(rest_customer)
-    # Brute force approach - timeout
-    barista_list = [0] * N  # Each barista's next available time
-    # print("next_available", next_available)
-    time = 0
-    for _ in range(rest_customer):
-        # print(baristaList)
-        barista = min(range(N), key=lambda i: barista_list[i])
-        # print("---------------", barista)
-
-        time += barista_list[barista]
-        barista_list[barista] += times[barista]
-    print(barista_list)
-    return barista + 1, barista_list[barista] + iteration_times * max_num
+    The generator jumps straight to the time at which customer `start` is
+    handed to a barista, seeds a heap with every barista's next free time from
+    there and then pops one customer per step, so each customer costs
+    O(log N).
+
+    Parameters
+    ----------
+    times : List[int]
+        A list of the time it takes each barista to prepare a drink.
+    start : int
+        The first queue position to yield.
+
+    Yields
+    ------
+    Tuple[int, int, int]
+        The queue position, the number of the barista who prepares that drink
+        and the time it will be ready.
+    """
+    if start < 1:
+        raise ValueError("Queue positions start at 1.")
+    N = len(times)
+    counts = time_counts(times)
+    begin, customer, _ = _search(start, N, [time for time, _ in counts], [count for _, count in counts])
+
+    # Ties on the free time pop the lower barista number first.
+    queue = [(-(-begin // time) * time, i) for i, time in enumerate(times)]
+    heapq.heapify(queue)
+    while True:
+        free, i = queue[0]
+        ready = free + times[i]
+        heapq.heapreplace(queue, (ready, i))
+        customer += 1
+        if customer >= start:
+            yield customer, i + 1, ready
 
 
 def read_input():
-    N, K = [int(i) for i in input().split()]
-    times = [int(i) for i in input().split()]
+    # Split the raw bytes once instead of decoding and splitting line by line;
+    # the times line can hold ~10^5 numbers.
+    data = sys.stdin.buffer.read().split()
+    N, K = int(data[0]), int(data[1])
+    times = list(map(int, data[2:2 + N]))
     return N, K, times
 
 
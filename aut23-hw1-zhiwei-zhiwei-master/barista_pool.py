@@ -0,0 +1,244 @@
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional, Tuple
+
+
+class IndexedHeap:
+    """Binary min-heap of keyed priorities.
+
+    Besides the usual push and pop, the heap tracks where every key sits so
+    that an arbitrary key can be removed in O(log n).
+    """
+
+    def __init__(self):
+        self.heap: List[Tuple[tuple, Hashable]] = []
+        self.position: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.position
+
+    def push(self, key: Hashable, priority: tuple):
+        """Inserts `key` with the given priority."""
+        if key in self.position:
+            raise ValueError(f"Key already in heap: {key!r}")
+        self.heap.append((priority, key))
+        self.position[key] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    def peek(self) -> Tuple[tuple, Hashable]:
+        """Returns the (priority, key) pair with the lowest priority."""
+        return self.heap[0]
+
+    def pop(self) -> Tuple[tuple, Hashable]:
+        """Removes and returns the (priority, key) pair with the lowest priority."""
+        item = self.heap[0]
+        self._remove_at(0)
+        return item
+
+    def remove(self, key: Hashable) -> tuple:
+        """Removes `key` from the heap and returns its priority."""
+        i = self.position[key]
+        priority = self.heap[i][0]
+        self._remove_at(i)
+        return priority
+
+    def _remove_at(self, i: int):
+        last = len(self.heap) - 1
+        self._swap(i, last)
+        _, key = self.heap.pop()
+        del self.position[key]
+        if i < last:
+            self._sift_down(i)
+            self._sift_up(i)
+
+    def _swap(self, i: int, j: int):
+        self.heap[i], self.heap[j] = self.heap[j], self.heap[i]
+        self.position[self.heap[i][1]] = i
+        self.position[self.heap[j][1]] = j
+
+    def _sift_up(self, i: int):
+        while i > 0:
+            parent = (i - 1) // 2
+            if self.heap[i][0] >= self.heap[parent][0]:
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i: int):
+        size = len(self.heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < size and self.heap[child][0] < self.heap[smallest][0]:
+                    smallest = child
+            if smallest == i:
+                break
+            self._swap(i, smallest)
+            i = smallest
+
+
+class BaristaPool:
+    """Incremental barista schedule with changing staff and a live queue.
+
+    Customers are served in the order they arrive. An arriving customer
+    goes to the lowest-numbered barista who is free, or waits in line if
+    everyone is busy. Whenever baristas free up, they take the customers at
+    the head of the line, again lowest number first. Baristas can join or
+    leave at any point: a barista who joins takes the next waiting customer
+    straight away, and one who leaves still finishes the drink they are
+    preparing but takes nobody else, so staff changes also reach the
+    customers already in line.
+
+    Idle baristas are kept in one indexed heap ordered by number and busy
+    baristas in another ordered by the time they free up, so every operation
+    costs O(log N) amortized per customer started.
+
+    Examples
+    --------
+    >>> pool = BaristaPool([10, 5])
+    >>> [pool.arrive(customer, 0) for customer in range(1, 5)]
+    [(1, 10), (2, 5), None, None]
+    >>> pool.add_barista(1)
+    3
+    >>> pool.query(3), pool.query(4)
+    ((3, 1), None)
+    >>> pool.advance(1)
+    >>> pool.query(4)
+    (3, 2)
+    >>> pool.remove_barista(3)
+    >>> pool.arrive(5, 3)
+    >>> pool.advance(5)
+    >>> pool.query(5)
+    (2, 10)
+    """
+
+    def __init__(self, times: List[int] = ()):
+        """Creates a pool with the given baristas on shift from time zero.
+
+        Parameters
+        ----------
+        times : List[int]
+            The time it takes each starting barista to prepare a drink.
+        """
+        self.times: Dict[int, int] = {}
+        self.idle = IndexedHeap()
+        self.busy = IndexedHeap()
+        self.clock = 0
+        # Barista and ready time of every customer, None while they wait.
+        self.served: Dict[Hashable, Optional[Tuple[int, int]]] = {}
+        self.waiting: Deque[Hashable] = deque()
+        self._next_barista = 1
+        for time in times:
+            self.add_barista(time)
+
+    def add_barista(self, time: int, t: Optional[int] = None) -> int:
+        """Puts a new barista on shift.
+
+        Parameters
+        ----------
+        time : int
+            The time it takes the barista to prepare a drink.
+        t : int, optional
+            When the barista becomes available. Defaults to the current time,
+            i.e. the latest arrival seen so far.
+
+        Returns
+        -------
+        int
+            The number of the new barista.
+        """
+        if time < 1:
+            raise ValueError("Preparation time must be positive.")
+        t = self.clock if t is None else t
+        if t < self.clock:
+            raise ValueError("Cannot add a barista in the past.")
+        barista = self._next_barista
+        self._next_barista += 1
+        self.times[barista] = time
+        if t == self.clock:
+            self.idle.push(barista, (barista,))
+        else:
+            self.busy.push(barista, (t, barista))
+        self._start_waiting(self.clock)
+        return barista
+
+    def remove_barista(self, barista: int):
+        """Takes a barista off shift. Drinks already started by them stand.
+
+        Parameters
+        ----------
+        barista : int
+            The number returned by `add_barista`.
+        """
+        if barista not in self.times:
+            raise ValueError(f"Unknown barista: {barista}")
+        del self.times[barista]
+        if barista in self.idle:
+            self.idle.remove(barista)
+        else:
+            self.busy.remove(barista)
+
+    def arrive(self, customer: Hashable, t: int) -> Optional[Tuple[int, int]]:
+        """Puts a customer at the end of the line.
+
+        Parameters
+        ----------
+        customer : Hashable
+            Identifier used to look the customer up later.
+        t : int
+            Arrival time; must not be earlier than the previous arrival.
+
+        Returns
+        -------
+        Tuple[int, int] or None
+            The number of the barista who prepares the drink and the time it
+            will be ready, or None if the customer has to wait for a barista.
+        """
+        if t < self.clock:
+            raise ValueError("Customers must arrive in chronological order.")
+        if customer in self.served:
+            raise ValueError(f"Customer already served: {customer!r}")
+        if not self.times:
+            raise ValueError("No baristas on shift.")
+        self.advance(t)
+        self.served[customer] = None
+        self.waiting.append(customer)
+        self._start_waiting(t)
+        return self.served[customer]
+
+    def advance(self, t: int):
+        """Moves the clock to `t`, starting waiting customers as baristas free up.
+
+        Parameters
+        ----------
+        t : int
+            The new time; must not be earlier than the current one.
+        """
+        if t < self.clock:
+            raise ValueError("Cannot move the clock back.")
+        while self.busy and self.busy.peek()[0][0] <= t:
+            free = self.busy.peek()[0][0]
+            # Everyone done by now competes only on their number.
+            while self.busy and self.busy.peek()[0][0] == free:
+                _, barista = self.busy.pop()
+                self.idle.push(barista, (barista,))
+            self._start_waiting(free)
+        self.clock = t
+
+    def query(self, customer: Hashable) -> Optional[Tuple[int, int]]:
+        """Returns the barista and ready time of an arrived customer, or None
+        if they are still waiting at the current time."""
+        try:
+            return self.served[customer]
+        except KeyError:
+            raise ValueError(f"Unknown customer: {customer!r}")
+
+    def _start_waiting(self, t: int):
+        # Idle baristas take the head of the line at time `t`.
+        while self.waiting and self.idle:
+            _, barista = self.idle.pop()
+            ready = t + self.times[barista]
+            self.busy.push(barista, (ready, barista))
+            self.served[self.waiting.popleft()] = (barista, ready)
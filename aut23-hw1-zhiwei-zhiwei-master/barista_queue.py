@@ -0,0 +1,359 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from barista import solve, time_counts, total_drinks_served
+
+# Bracket searches run on int64; keep every start time and customer count
+# comfortably below 2**63 so that `t // time * count` sums cannot wrap.
+INT64_LIMIT = 2 ** 62
+# Upper bound on the number of int64 cells in one (queries x distinct times)
+# block, which keeps the temporaries of a vectorized sweep around 32 MB.
+BLOCK_CELLS = 1 << 22
+# Brackets holding at most this many drinks are resolved by listing the
+# drinks; a batch lists at most this many per query.
+SWEEP_DRINKS = 1024
+# A sorted run of positions is swept in pieces of at most this many drinks.
+MAX_SWEEP_DRINKS = 1 << 20
+# Cells per block of the float path, small enough to stay in cache.
+FLOAT_BLOCK_CELLS = 1 << 16
+# Integers up to here are exact in float64.
+FLOAT_EXACT = 2 ** 53
+
+
+class ServedCounter:
+    """Vectorized `barista.total_drinks_served` for one barista roster.
+
+    The roster is collapsed once into int64 arrays of distinct service times
+    and multiplicities. Calling the counter with many candidate times computes
+    `floor(t / time)` for all of them against all distinct times as one 2-D
+    array operation, in blocks of at most `BLOCK_CELLS` cells. While the
+    result is exact in float64 (`exact_in_float`), the division runs in
+    floating point on cache-sized blocks instead.
+
+    Examples
+    --------
+    >>> served = ServedCounter([10, 5, 5])
+    >>> served([0, 9, 10, 20]).tolist()
+    [0, 2, 5, 10]
+    """
+
+    def __init__(self, times: List[int]):
+        """Collapses the roster.
+
+        Parameters
+        ----------
+        times : List[int]
+            The time it takes each barista to prepare a drink.
+        """
+        self.pairs = sorted(time_counts(times))
+        self.distinct = np.array([time for time, _ in self.pairs], dtype=np.int64)
+        self.counts = np.array([count for _, count in self.pairs], dtype=np.int64)
+        self.N = int(self.counts.sum())
+        self.float_distinct = self.distinct.astype(np.float64)
+        self.float_counts = self.counts.astype(np.float64)
+
+    def fits_int64(self, t: int) -> bool:
+        """Whether counting up to time `t` is safe on int64 arrays."""
+        return t < INT64_LIMIT and t // int(self.distinct[0]) * self.N < INT64_LIMIT
+
+    def exact_in_float(self, t: int) -> bool:
+        """Whether counting up to time `t` is exact in float64.
+
+        A correctly rounded t / time only rounds up to the next integer if
+        t >= 2**53, so below that its floor is exact, and so is a sum of such
+        floors that stays below 2**53.
+        """
+        return t < FLOAT_EXACT and t // int(self.distinct[0]) * self.N < FLOAT_EXACT
+
+    def __call__(self, t) -> np.ndarray:
+        """Counts the drinks finished by each of the given times.
+
+        Parameters
+        ----------
+        t : array_like of int
+            Non-negative points in time.
+
+        Returns
+        -------
+        np.ndarray
+            Drinks ready at or before each time, with the shape of `t`. The
+            dtype is int64, or object (Python ints) when the counts could
+            overflow int64.
+        """
+        values = np.asarray(t)
+        if values.dtype == object or not self.fits_int64(int(values.max(initial=0))):
+            flat = [total_drinks_served(int(x), self.pairs) for x in values.ravel()]
+            return np.array(flat, dtype=object).reshape(values.shape)
+
+        values = values.astype(np.int64, copy=False)
+        flat = values.ravel()
+        served = np.empty(flat.shape, dtype=np.int64)
+        if self.exact_in_float(int(values.max(initial=0))):
+            # Float division is several times faster than int64 division.
+            rows = max(1, FLOAT_BLOCK_CELLS // self.distinct.size)
+            buffer = np.empty((min(rows, flat.size), self.distinct.size))
+            for i in range(0, flat.size, rows):
+                block = buffer[:flat[i:i + rows].size]
+                np.divide(flat[i:i + rows, None], self.float_distinct[None, :], out=block)
+                served[i:i + rows] = np.floor(block, out=block) @ self.float_counts
+            return served.reshape(values.shape)
+        rows = max(1, BLOCK_CELLS // self.distinct.size)
+        for i in range(0, flat.size, rows):
+            served[i:i + rows] = (flat[i:i + rows, None] // self.distinct[None, :]) @ self.counts
+        return served.reshape(values.shape)
+
+
+class BaristaQueue:
+    """Answers many "when is customer K served" queries for one barista roster.
+
+    The roster is collapsed once into its distinct service times, how many
+    baristas share each of them and which baristas those are. A batch of
+    positions is then sorted, de-duplicated and answered by searching for
+    every start time at once with array operations.
+
+    Examples
+    --------
+    >>> queue = BaristaQueue([10, 5])
+    >>> baristas, ready = queue.query([1, 2, 3, 4])
+    >>> baristas.tolist(), ready.tolist()
+    ([1, 2, 2, 1], [10, 5, 10, 20])
+    """
+
+    def __init__(self, times: List[int]):
+        """Precomputes the roster summary.
+
+        Parameters
+        ----------
+        times : List[int]
+            The time it takes each barista to prepare a drink.
+        """
+        self.times = list(times)
+        self.N = len(self.times)
+        self.served = ServedCounter(self.times)
+        self.distinct, self.counts = self.served.distinct, self.served.counts
+        group = np.searchsorted(self.distinct, np.asarray(self.times, dtype=np.int64))
+        # Barista indices grouped by service time; a stable sort keeps each
+        # group in increasing barista order.
+        self.members = np.argsort(group, kind="stable")
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)))
+        self.rate = float(np.sum(self.counts / self.distinct))
+
+    def query(self, positions) -> Tuple[np.ndarray, np.ndarray]:
+        """Finds the barista and ready time for every queue position.
+
+        Parameters
+        ----------
+        positions : array_like of int
+            Queue positions, starting at 1. Any order, duplicates allowed.
+
+        Returns
+        -------
+        baristas : np.ndarray
+            The number (starting at 1) of the barista serving each position.
+        ready : np.ndarray
+            The time each position's drink is ready.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        if positions.size and positions.min() < 1:
+            raise ValueError("Queue positions start at 1.")
+        queries, inverse = np.unique(positions, return_inverse=True)
+
+        if queries.size and not self._fits_int64(int(queries[-1])):
+            # Too large for the vectorized path: answer each query exactly.
+            answers = [solve(self.N, int(k), self.times) for k in queries]
+            baristas = np.array([a[0] for a in answers], dtype=object)
+            ready = np.array([a[1] for a in answers], dtype=object)
+        else:
+            starts, before, free = self._start_times(queries)
+            baristas = self._pick(starts, queries - before, free) + 1
+            ready = starts + np.asarray(self.times, dtype=np.int64)[baristas - 1]
+        return baristas[inverse].reshape(positions.shape), ready[inverse].reshape(positions.shape)
+
+    def _fits_int64(self, K: int) -> bool:
+        """Whether positions up to `K` can be answered on int64 arrays."""
+        latest = int(K // self.rate + 2) * 2 + int(self.distinct[-1])
+        return K + self.N < INT64_LIMIT and self.served.fits_int64(latest)
+
+    def _start_times(self, K: np.ndarray) -> Tuple[np.ndarray, np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Earliest time by which at least `K` customers have started, per query.
+
+        The queries come sorted, and a sorted batch is swept rather than
+        searched one position at a time. Consecutive positions at most
+        `_cluster_gap()` apart form a run, and only the first and last
+        position of each run are searched. Runs are also capped at
+        `MAX_SWEEP_DRINKS`. The search is the one in `barista.first_full_time`,
+        run in lockstep: Newton steps on the served-drinks line bracket each
+        start time to at most `SWEEP_DRINKS` drinks. Every drink ending between
+        a run's two brackets is then listed once, in time order, and each
+        position in the run is answered with a binary search on the running
+        count.
+
+        Start times are monotone in K. So after every round, each bracket is
+        also tightened by its neighbours': a running maximum of the lower
+        ends from the left, and a running minimum of the upper ends from the
+        right.
+
+        Returns
+        -------
+        starts : np.ndarray
+            The start time of every query.
+        before : np.ndarray
+            How many customers started strictly before it.
+        free : Tuple[np.ndarray, np.ndarray, np.ndarray]
+            The groups (indices into `distinct`) of the baristas that take a
+            customer at each start time, as one array and every query's
+            [begin, end) slice of it.
+        """
+        target = K - self.N
+        starts, before = np.zeros(K.shape, dtype=np.int64), np.zeros(K.shape, dtype=np.int64)
+        empty = np.zeros(K.shape, dtype=np.int64)
+        # Positions within the first round are handed out at time zero.
+        later = np.flatnonzero(K > self.N)
+        if not later.size:
+            return starts, before, (empty, empty, empty)
+
+        joined = np.diff(K[later]) <= self._cluster_gap()
+        joined &= np.diff(K[later] // MAX_SWEEP_DRINKS) == 0
+        run_first = later[np.flatnonzero(np.concatenate(([True], ~joined)))]
+        run_last = later[np.flatnonzero(np.concatenate((~joined, [True])))]
+        low, low_served, high, high_served = self._brackets(target, np.union1d(run_first, run_last))
+
+        run = np.cumsum(np.concatenate(([True], ~joined))) - 1
+        ends, groups, served, start, end = self._list_drinks(low[run_first], high[run_last])
+        base = np.where(start > 0, served[start - 1], 0)
+        # The first listed drink to bring the count up to the target, and the
+        # first and last drink ending at the same time as it.
+        p = np.searchsorted(served, base[run] + target[later] - low_served[run_first][run])
+        new_time = np.ones(ends.size, dtype=bool)
+        new_time[1:] = ends[1:] != ends[:-1]
+        new_time[start[start < ends.size]] = True
+        times = np.flatnonzero(new_time)
+        same = np.cumsum(new_time)[p] - 1
+        begin, stop = times[same], np.append(times[1:], ends.size)[same]
+
+        starts[later] = ends[p]
+        before[later] = low_served[run_first][run] + np.where(begin > 0, served[begin - 1], 0) - base[run] + self.N
+        group_begin, group_end = empty.copy(), empty.copy()
+        group_begin[later], group_end[later] = begin, stop
+        return starts, before, (groups, group_begin, group_end)
+
+    def _cluster_gap(self) -> int:
+        """Largest gap between positions that are swept together.
+
+        Listing a drink costs about as much as dividing by a few dozen
+        service times, and a search makes two or three passes over all of
+        them. A gap smaller than an eighth of the distinct times is cheaper to
+        sweep than to search.
+        """
+        return max(SWEEP_DRINKS, self.distinct.size // 8)
+
+    def _brackets(self, target: np.ndarray, active: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """Brackets the start time of the `active` queries to a few drinks.
+
+        Returns
+        -------
+        Tuple[np.ndarray, ...]
+            low, drinks served by low, high and drinks served by high, with
+            served(low) < target <= served(high) for every active query.
+        """
+        low, low_served = np.full(target.shape, -1), np.full(target.shape, -1)
+        high, high_served = np.full(target.shape, INT64_LIMIT), np.full(target.shape, INT64_LIMIT)
+        latest = (2 * ((target + self.N) / self.rate + 2)).astype(np.int64)
+        t = np.minimum(((target + self.N / 2) / self.rate).astype(np.int64), latest)
+        margin = np.ones(target.shape)
+        bisect = np.zeros(target.shape, dtype=bool)
+        while active.size:
+            ta, goal = t[active], target[active]
+            drinks = self.served(ta)
+            width = high[active] - low[active]
+            enough = drinks >= goal
+            high[active[enough]], high_served[active[enough]] = ta[enough], drinks[enough]
+            low[active[~enough]], low_served[active[~enough]] = ta[~enough], drinks[~enough]
+            np.maximum.accumulate(low, out=low)
+            np.maximum.accumulate(low_served, out=low_served)
+            high[::-1] = np.minimum.accumulate(high[::-1])
+            high_served[::-1] = np.minimum.accumulate(high_served[::-1])
+
+            lo, hi = low[active], high[active]
+            lo_served, hi_served = low_served[active], high_served[active]
+            both = (lo >= 0) & (hi < INT64_LIMIT)
+            done = both & ((hi_served - lo_served <= SWEEP_DRINKS) | (hi - lo <= 1))
+            # Aim past the line's root by a few standard deviations of the
+            # staircase, as `barista._search` does.
+            miss = goal - drinks
+            step = ((np.abs(miss) + 3 * np.sqrt(np.abs(miss)) + margin[active]) / self.rate).astype(np.int64) + 1
+            guess = np.clip(np.where(miss > 0, ta + step, ta - step), 0, latest[active])
+            # A guess outside the bracket falls back to interpolating between
+            # its ends, or to bisection when a step failed to halve it.
+            fraction = (goal - lo_served) / np.maximum(hi_served - lo_served, 1)
+            inner = np.clip(lo + (fraction * (hi - lo)).astype(np.int64), lo + 1, hi - 1)
+            halve = both & ~bisect[active] & (hi - lo > width // 2)
+            inside = (lo < guess) & (guess < hi)
+            t[active] = np.where(both & ~inside, np.where(halve, lo + (hi - lo) // 2, inner), guess)
+            bisect[active] = halve
+            margin[active] = np.where(both, margin[active], 2 * margin[active])
+            active = active[~done]
+        return low, low_served, high, high_served
+
+    def _list_drinks(self, low: np.ndarray, high: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """Lists every drink that ends in each window (low, high].
+
+        Returns
+        -------
+        Tuple[np.ndarray, ...]
+            The end times and groups of the drinks, window by window and in
+            time order within a window, the running count of baristas they
+            free, and each window's [start, end) slice of the list.
+        """
+        # A service time has a drink ending in (low, high] exactly when
+        # high % time < high - low.
+        windows, groups = [], []
+        exact = self.served.exact_in_float(int(high.max()))
+        divisor = self.served.float_distinct
+        rows = max(1, (FLOAT_BLOCK_CELLS if exact else BLOCK_CELLS) // self.distinct.size)
+        buffer = np.empty((min(rows, low.size), self.distinct.size))
+        for i in range(0, low.size, rows):
+            lo, hi = low[i:i + rows, None], high[i:i + rows, None]
+            if exact:
+                remainder = buffer[:hi.size]
+                np.divide(hi, divisor, out=remainder)
+                np.floor(remainder, out=remainder)
+                np.multiply(remainder, divisor, out=remainder)
+                np.subtract(hi, remainder, out=remainder)
+            else:
+                remainder = hi % self.distinct
+            w, g = np.nonzero(remainder < hi - lo)
+            windows.append(w + i)
+            groups.append(g)
+        w, g = np.concatenate(windows), np.concatenate(groups)
+        time = self.distinct[g]
+        first = low[w] // time + 1
+        n = high[w] // time - first + 1
+        w, g = np.repeat(w, n), np.repeat(g, n)
+        k = np.repeat(first, n) + np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        ends = k * self.distinct[g]
+        order = np.lexsort((ends, w))
+        w, g, ends = w[order], g[order], ends[order]
+        bounds = np.searchsorted(w, np.arange(low.size + 1))
+        return ends, g, np.cumsum(self.counts[g]), bounds[:-1], bounds[1:]
+
+    def _pick(self, starts: np.ndarray, ranks: np.ndarray, free) -> np.ndarray:
+        """Index of the `ranks`-th lowest-numbered barista free at each start time."""
+        groups, begin, end = free
+        picked = np.empty(starts.shape, dtype=np.int64)
+        first = starts == 0
+        # Everyone is free at time zero, so rank is the barista index itself.
+        picked[first] = ranks[first] - 1
+
+        # Usually exactly one service time divides the start time, and its
+        # group already lists baristas in order.
+        single = ~first & (end - begin == 1)
+        group = groups[begin[single]]
+        picked[single] = self.members[self.offsets[group] + ranks[single] - 1]
+        for j in np.flatnonzero(~first & ~single):
+            candidates = np.concatenate(
+                [self.members[self.offsets[g]:self.offsets[g + 1]] for g in groups[begin[j]:end[j]]])
+            rank = ranks[j] - 1
+            picked[j] = np.partition(candidates, rank)[rank]
+        return picked
@@ -0,0 +1,143 @@
+"""Scaling benchmarks for `barista.solve`.
+
+Instances are generated along four axes, each varied on its own around a
+shared base case: the number of baristas N, the queue position K, the range
+of service times (including pairwise-coprime rosters whose LCM is enormous)
+and how many distinct service times the roster has. Every scenario is timed,
+then re-run under `tracemalloc` for its peak memory::
+
+    python3 bench_barista.py --save baseline.json
+    python3 bench_barista.py --compare baseline.json
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from barista import solve
+
+BASE = {"N": 10 ** 4, "K": 10 ** 9, "max_time": 10 ** 5, "distinct": None, "coprime": False}
+AXES = {
+    "N": [10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6],
+    "K": [10 ** 3, 10 ** 6, 10 ** 9, 10 ** 12, 10 ** 15, 10 ** 18],
+    "max_time": [10, 10 ** 3, 10 ** 5, 10 ** 7, 10 ** 9],
+    "coprime": [True],
+    "distinct": [1, 10, 10 ** 3],
+}
+# A run is a regression when it is this many times slower (or hungrier) than
+# the baseline. Timings on shared machines are noisy, hence the slack.
+TOLERANCE = 1.5
+
+
+@dataclass
+class Result:
+    scenario: str
+    N: int
+    K: int
+    seconds: float
+    throughput: float
+    peak_bytes: int
+
+
+def scenarios(max_n: Optional[int] = None) -> Dict[str, dict]:
+    """Returns the named parameter sets, one axis varied at a time."""
+    named = {"base": dict(BASE)}
+    for axis, values in AXES.items():
+        for value in values:
+            params = dict(BASE, **{axis: value})
+            if params != BASE and (max_n is None or params["N"] <= max_n):
+                named[f"{axis}={value}"] = params
+    return named
+
+
+def generate(N: int, K: int, max_time: int, distinct: Optional[int] = None,
+             coprime: bool = False, seed: int = 0) -> List[int]:
+    """Generates a roster of `N` service times.
+
+    With `coprime` the roster cycles through the largest primes up to
+    `max_time`, which makes the LCM of the times astronomically large. With
+    `distinct` set the times are drawn from that many distinct values, so the
+    roster is mostly duplicates.
+    """
+    rng = random.Random(seed)
+    if coprime:
+        pool = []
+        candidate = max_time
+        while len(pool) < min(N, 100) and candidate > 1:
+            if all(candidate % d for d in range(2, int(candidate ** 0.5) + 1)):
+                pool.append(candidate)
+            candidate -= 1
+        return [pool[i % len(pool)] for i in range(N)]
+    if distinct is not None:
+        pool = [rng.randint(1, max_time) for _ in range(distinct)]
+        return [rng.choice(pool) for _ in range(N)]
+    return [rng.randint(1, max_time) for _ in range(N)]
+
+
+def measure(name: str, params: dict, repeats: int = 3) -> Result:
+    """Times `solve` on one scenario and records its peak traced memory."""
+    N, K = params["N"], params["K"]
+    times = generate(**params)
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        solve(N, K, times)
+        best = min(best, time.perf_counter() - started)
+
+    # tracemalloc slows allocation down, so memory gets a run of its own.
+    tracemalloc.start()
+    solve(N, K, times)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Result(name, N, K, best, N / best, peak)
+
+
+def compare(results: List[Result], baseline: Dict[str, dict],
+            tolerance: float = TOLERANCE) -> List[str]:
+    """Lists the scenarios that got slower or use more memory than the baseline."""
+    regressions = []
+    for result in results:
+        old = baseline.get(result.scenario)
+        if old is None:
+            continue
+        if result.seconds > tolerance * old["seconds"]:
+            regressions.append(f"{result.scenario}: {old['seconds']:.4f}s -> {result.seconds:.4f}s")
+        if result.peak_bytes > tolerance * old["peak_bytes"]:
+            regressions.append(f"{result.scenario}: {old['peak_bytes']} B -> {result.peak_bytes} B")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", help="write the results to this JSON baseline")
+    parser.add_argument("--compare", help="JSON baseline to check the results against")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--max-n", type=int, default=None, help="skip scenarios with more baristas")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = []
+    for name, params in scenarios(args.max_n).items():
+        result = measure(name, params, args.repeats)
+        results.append(result)
+        print(f"{name:>24}  {result.seconds:9.4f}s  {result.throughput:14.0f} baristas/s  "
+              f"{result.peak_bytes / 2 ** 20:8.2f} MB", flush=True)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({r.scenario: asdict(r) for r in results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Runs `barista.solve` over a directory of testcases in parallel.
+
+Every `inputNN.txt` with a matching `outputNN.txt` is one case. Cases are
+parsed with a bulk numpy parser, fanned out over a process pool and reported
+as JSON on stdout, one entry per case with its timings and verdict::
+
+    python3 run_cases.py testcases --workers 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+
+from barista import solve
+
+INPUT_PREFIX = "input"
+OUTPUT_PREFIX = "output"
+
+
+def parse_ints(data: bytes) -> np.ndarray:
+    """Parses whitespace-separated integers from raw bytes in one pass.
+
+    Raises
+    ------
+    ValueError
+        If `data` holds anything but integers. NumPy only warns and stops
+        parsing there, so the warning is turned into an error.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return np.fromstring(data, dtype=np.int64, sep=" ")
+        except (DeprecationWarning, ValueError):
+            raise ValueError("Expected whitespace-separated integers.") from None
+
+
+def read_case(file) -> Tuple[int, int, np.ndarray]:
+    """Reads `N`, `K` and the service times from an input file or binary stream.
+
+    Raises
+    ------
+    ValueError
+        If the data is not `N`, `K` and exactly `N` service times.
+    """
+    if isinstance(file, (str, bytes, os.PathLike)):
+        with open(file, "rb") as f:
+            data = f.read()
+    else:
+        data = file.read()
+    values = parse_ints(data)
+    if len(values) < 2 or len(values) != 2 + values[0]:
+        raise ValueError(f"Expected N, K and N service times, got {len(values)} integers.")
+    N, K = int(values[0]), int(values[1])
+    return N, K, values[2:]
+
+
+def find_cases(directory: str) -> List[Tuple[str, str, str]]:
+    """Lists (name, input path, output path) for every complete case in `directory`."""
+    cases = []
+    for name in sorted(os.listdir(directory)):
+        if not name.startswith(INPUT_PREFIX):
+            continue
+        output = os.path.join(directory, OUTPUT_PREFIX + name[len(INPUT_PREFIX):])
+        if os.path.isfile(output):
+            cases.append((os.path.splitext(name)[0], os.path.join(directory, name), output))
+    return cases
+
+
+def run_case(case: Tuple[str, str, str]) -> dict:
+    """Solves one case and compares the answer against its expected output.
+
+    A case whose files cannot be parsed fails with an "error" entry rather
+    than a wrong answer.
+    """
+    name, input_path, output_path = case
+    started = time.perf_counter()
+    try:
+        N, K, times = read_case(input_path)
+        with open(output_path, "rb") as f:
+            expected = parse_ints(f.read()).tolist()
+    except ValueError as error:
+        return {"case": name, "passed": False, "error": str(error)}
+    parsed = time.perf_counter()
+    answer = list(solve(N, K, times.tolist()))
+    solved = time.perf_counter()
+    return {
+        "case": name,
+        "passed": answer == expected,
+        "answer": answer,
+        "expected": expected,
+        "parse_seconds": parsed - started,
+        "solve_seconds": solved - parsed,
+    }
+
+
+def run_directory(directory: str, workers: int = None) -> List[dict]:
+    """Runs every case in `directory` on a pool of `workers` processes."""
+    cases = find_cases(directory)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_case, cases))
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="directory holding inputNN.txt/outputNN.txt pairs")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results = run_directory(args.directory, args.workers)
+    report = {
+        "cases": results,
+        "passed": sum(result["passed"] for result in results),
+        "failed": sum(not result["passed"] for result in results),
+        "wall_seconds": time.perf_counter() - started,
+    }
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 1 if report["failed"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,12 @@
+import heapq
+import itertools
 import os
+import random
+
 import pytest
 
-from barista import solve
+import barista
+from barista import iter_schedule, solve
 
 
 INPUT_PREFIX = "input"
@@ -24,10 +29,10 @@ input_files = list(map(lambda x: x[0], files))  # Used as ids for the tests.
 
 
 def read_input(file):
-    with open(file) as f:
-        n, k = [int(i) for i in f.readline().split()]
-        times = [int(i) for i in f.readline().split()]
-        return n, k, times
+    with open(file, "rb") as f:
+        data = f.read().split()
+        n, k = int(data[0]), int(data[1])
+        return n, k, list(map(int, data[2:2 + n]))
 
 def read_output(file):
     with open(file) as f:
@@ -53,3 +58,86 @@ def test_solve(file_io):
     barista, T = solve(n, k, times)
 
     assert (barista, T) == (expected_barista, expected_T)
+
+
+def simulate(n, k, times):
+    # Reference answer: hand customers out one at a time to the barista that
+    # frees up first, breaking ties by the lower barista number.
+    queue = [(0, i) for i in range(n)]
+    heapq.heapify(queue)
+    for _ in range(k):
+        start, i = heapq.heappop(queue)
+        heapq.heappush(queue, (start + times[i], i))
+    return i + 1, start + times[i]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_solve_matches_simulation(seed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 12)
+    k = rng.randint(1, 300)
+    times = [rng.randint(1, 15) for _ in range(n)]
+
+    assert solve(n, k, times) == simulate(n, k, times)
+
+
+def assert_first_to_start(k, times, barista, T):
+    # Exactly k customers have started by the time yours starts, fewer than k
+    # one tick earlier, and your barista is free then.
+    start = T - times[barista - 1]
+    assert start % times[barista - 1] == 0
+    assert sum(start // t + 1 for t in times) >= k
+    assert sum((start - 1) // t + 1 for t in times) < k
+
+
+def test_solve_large_position():
+    n, k = 3, 10 ** 18
+    times = [99991, 99989, 99961]  # pairwise coprime, so the LCM is huge
+
+    assert_first_to_start(k, times, *solve(n, k, times))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_solve_wide_times(seed, monkeypatch):
+    rng = random.Random(seed)
+    n = rng.randint(1, 2000)
+    times = [rng.randint(1, 10 ** rng.randint(1, 9)) for _ in range(n)]
+    # A tiny sweep forces the bracket all the way down, bisection included.
+    monkeypatch.setattr(barista, "SWEEP_DRINKS", rng.choice([0, 1, 1 << 14]))
+
+    for k in (n + 1, n + rng.randint(1, 10 ** 4), rng.randint(1, 10 ** 18)):
+        if k > n:
+            assert_first_to_start(k, times, *solve(n, k, times))
+    small = [t % 7 + 1 for t in times[:8]]
+    assert solve(len(small), 500, small) == simulate(len(small), 500, small)
+
+
+@pytest.mark.execution_timeout(TIMEOUT)
+def test_solve_million_distinct_times():
+    n, k = 10 ** 6, 10 ** 18
+    times = [i * 7919 % 10 ** 9 + 1 for i in range(n)]
+
+    assert_first_to_start(k, times, *solve(n, k, times))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_iter_schedule(seed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 8)
+    times = [rng.randint(1, 10) for _ in range(n)]
+    start = rng.randint(1, 200)
+
+    window = list(itertools.islice(iter_schedule(times, start=start), 50))
+
+    assert [customer for customer, _, _ in window] == list(range(start, start + 50))
+    for customer, barista, ready in window:
+        assert (barista, ready) == simulate(n, customer, times)
+
+
+def test_iter_schedule_far_start():
+    times = [99991, 99989, 99961]
+    k = 10 ** 15
+
+    first = next(iter_schedule(times, start=k))
+
+    assert first == (k, *solve(len(times), k, times))
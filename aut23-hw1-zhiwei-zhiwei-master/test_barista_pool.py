@@ -0,0 +1,119 @@
+import random
+
+import pytest
+
+from barista import solve
+from barista_pool import BaristaPool, IndexedHeap
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_whole_queue_at_once_matches_solve(seed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 10)
+    times = [rng.randint(1, 12) for _ in range(n)]
+    pool = BaristaPool(times)
+
+    for k in range(1, 200):
+        pool.arrive(k, 0)
+    pool.advance(200 * 12)
+
+    assert [pool.query(k) for k in range(1, 200)] == [solve(n, k, times) for k in range(1, 200)]
+
+
+def test_arrivals_over_time():
+    pool = BaristaPool([4, 4])
+
+    assert pool.arrive("a", 0) == (1, 4)
+    assert pool.arrive("b", 1) == (2, 5)
+    # Nobody is free at 2, so "c" waits for barista 1, who frees up first.
+    assert pool.arrive("c", 2) is None
+    pool.advance(4)
+    assert pool.query("c") == (1, 8)
+    # Both are free again by 10, so the lower number wins.
+    assert pool.arrive("d", 10) == (1, 14)
+    assert pool.query("b") == (2, 5)
+
+
+def test_staff_changes():
+    pool = BaristaPool([3])
+    late = pool.add_barista(1, t=5)
+
+    assert pool.arrive(1, 0) == (1, 3)
+    assert pool.arrive(2, 0) is None
+    pool.advance(3)
+    assert pool.query(2) == (1, 6)
+    # The new barista is on shift from 5, before barista 1 frees up at 6.
+    assert pool.arrive(3, 3) is None
+    pool.advance(5)
+    assert pool.query(3) == (late, 6)
+
+    pool.remove_barista(1)
+    assert pool.arrive(4, 7) == (late, 8)
+    assert pool.arrive(5, 7) is None
+    pool.advance(8)
+    assert pool.query(5) == (late, 9)
+    assert pool.query(2) == (1, 6)
+
+
+def test_staff_changes_reach_the_line():
+    pool = BaristaPool([10])
+    assert [pool.arrive(customer, 0) for customer in (1, 2, 3)] == [(1, 10), None, None]
+
+    # A new barista takes the head of the line, not only later arrivals.
+    pool.add_barista(10)
+    assert pool.query(2) == (2, 10)
+    assert pool.arrive(4, 0) is None
+    pool.advance(10)
+    assert [pool.query(customer) for customer in (3, 4)] == [(1, 20), (2, 20)]
+
+    # A barista who leaves finishes their drink but starts no other.
+    assert pool.arrive(5, 10) is None
+    pool.remove_barista(2)
+    pool.advance(30)
+    assert pool.query(4) == (2, 20)
+    assert pool.query(5) == (1, 30)
+
+
+def test_line_waits_for_staff():
+    pool = BaristaPool([5])
+    pool.arrive("a", 0)
+    pool.arrive("b", 1)
+    pool.remove_barista(1)
+
+    pool.advance(100)
+    assert pool.query("b") is None
+    pool.add_barista(2)
+    assert pool.query("b") == (2, 102)
+
+
+def test_errors():
+    pool = BaristaPool()
+    with pytest.raises(ValueError, match="No baristas"):
+        pool.arrive(1, 0)
+
+    pool.add_barista(2)
+    pool.arrive(1, 5)
+    with pytest.raises(ValueError, match="chronological"):
+        pool.arrive(2, 4)
+    with pytest.raises(ValueError, match="clock back"):
+        pool.advance(4)
+    with pytest.raises(ValueError, match="already served"):
+        pool.arrive(1, 6)
+    with pytest.raises(ValueError, match="Unknown barista"):
+        pool.remove_barista(7)
+    with pytest.raises(ValueError, match="Unknown customer"):
+        pool.query(2)
+
+
+def test_indexed_heap_removal():
+    rng = random.Random(0)
+    heap = IndexedHeap()
+    priorities = {key: (rng.random(),) for key in range(100)}
+    for key, priority in priorities.items():
+        heap.push(key, priority)
+    for key in rng.sample(range(100), 40):
+        assert heap.remove(key) == priorities.pop(key)
+
+    popped = [heap.pop() for _ in range(len(heap))]
+
+    assert popped == sorted((p, k) for k, p in priorities.items())
@@ -0,0 +1,117 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from barista import solve, time_counts, total_drinks_served
+import barista_queue
+from barista_queue import BaristaQueue, ServedCounter
+from test_barista import files, input_files, read_input, read_output
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_served_counter(seed):
+    rng = random.Random(seed)
+    times = [rng.choice([3, 7, 8, 1000]) for _ in range(rng.randint(1, 50))]
+    t = np.array([rng.randint(0, 10 ** 6) for _ in range(40)]).reshape(8, 5)
+
+    served = ServedCounter(times)(t)
+
+    assert served.dtype == np.int64
+    assert served.shape == (8, 5)
+    pairs = time_counts(times)
+    assert served.ravel().tolist() == [total_drinks_served(int(x), pairs) for x in t.ravel()]
+
+
+def test_served_counter_overflow():
+    times = [1, 1, 2]
+    t = [2 ** 62, 5]
+
+    served = ServedCounter(times)(np.array(t, dtype=object))
+
+    assert served.dtype == object
+    assert served.tolist() == [2 ** 63 + 2 ** 61, 12]
+    assert ServedCounter(times)(np.array(t)).tolist() == served.tolist()
+
+
+def test_served_counter_past_float():
+    # Counts above 2**53 are not exact in float64 and take the int64 path.
+    times = [1, 3, 7]
+    t = [2 ** 60 + 5, 2 ** 53 + 1, 2 ** 52, 0]
+
+    served = ServedCounter(times)(np.array(t))
+
+    assert served.dtype == np.int64
+    assert served.tolist() == [total_drinks_served(x, time_counts(times)) for x in t]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_query_matches_solve(seed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 12)
+    times = [rng.randint(1, 15) for _ in range(n)]
+    positions = [rng.randint(1, 300) for _ in range(50)]
+
+    baristas, ready = BaristaQueue(times).query(positions)
+
+    assert list(zip(baristas.tolist(), ready.tolist())) == [solve(n, k, times) for k in positions]
+
+
+@pytest.mark.parametrize("input_file,output_file", files, ids=input_files)
+def test_query_testcases(input_file, output_file):
+    n, k, times = read_input(input_file)
+    expected = read_output(output_file)
+    queue = BaristaQueue(times)
+
+    # The expected answer has to come out regardless of what else is batched with it.
+    baristas, ready = queue.query(np.array([k, 1, k, max(1, k // 2)]))
+
+    assert [baristas[0], ready[0]] == expected
+    assert [baristas[2], ready[2]] == expected
+
+
+@pytest.mark.parametrize("sweep", [1, 8, 1024])
+def test_query_consecutive_positions(monkeypatch, sweep):
+    # Runs of close positions are swept together; vary how long they get.
+    monkeypatch.setattr(barista_queue, "SWEEP_DRINKS", sweep)
+    monkeypatch.setattr(barista_queue, "MAX_SWEEP_DRINKS", 4 * sweep)
+    rng = random.Random(sweep)
+    times = [rng.randint(1, 60) for _ in range(40)]
+    positions = list(range(1, 400)) + list(range(10 ** 6, 10 ** 6 + 200)) + [3 * 10 ** 6]
+
+    baristas, ready = BaristaQueue(times).query(positions)
+
+    assert list(zip(baristas.tolist(), ready.tolist())) == [solve(40, k, times) for k in positions]
+
+
+def test_query_scattered_positions():
+    # The case with the longest roster.
+    n, k, times = read_input(max(files, key=lambda f: os.path.getsize(f[0]))[0])
+    rng = random.Random(0)
+    positions = [rng.randint(1, k) for _ in range(20)] + [k, k - 1, k + 1]
+
+    baristas, ready = BaristaQueue(times).query(positions)
+
+    assert list(zip(baristas.tolist(), ready.tolist())) == [solve(n, p, times) for p in positions]
+
+
+def test_query_keeps_shape():
+    queue = BaristaQueue([10, 5])
+    baristas, ready = queue.query(np.array([[4, 1], [2, 3]]))
+
+    assert baristas.tolist() == [[1, 1], [2, 2]]
+    assert ready.tolist() == [[20, 10], [5, 10]]
+
+
+def test_query_huge_positions():
+    times = [99991, 99989, 99961]
+    baristas, ready = BaristaQueue(times).query([9 * 10 ** 18, 7])
+
+    assert (baristas[0], ready[0]) == solve(3, 9 * 10 ** 18, times)
+    assert (baristas[1], ready[1]) == solve(3, 7, times)
+
+
+def test_query_rejects_bad_positions():
+    with pytest.raises(ValueError):
+        BaristaQueue([1, 2]).query([0])
@@ -0,0 +1,34 @@
+import math
+
+from bench_barista import Result, compare, generate, measure, scenarios
+
+
+def test_scenarios_vary_one_axis():
+    named = scenarios(max_n=10 ** 4)
+
+    assert "base" in named
+    assert "N=1000000" not in named
+    assert all(sum(params[k] != named["base"][k] for k in params) == 1
+               for name, params in named.items() if name != "base")
+
+
+def test_generate_coprime():
+    times = generate(N=50, K=1, max_time=1000, coprime=True)
+
+    distinct = sorted(set(times))
+    assert len(times) == 50
+    assert all(math.gcd(a, b) == 1 for a in distinct for b in distinct if a < b)
+
+
+def test_generate_duplicates():
+    assert len(set(generate(N=1000, K=1, max_time=10 ** 5, distinct=3))) <= 3
+
+
+def test_measure_and_compare():
+    result = measure("tiny", dict(N=10, K=1000, max_time=50, distinct=None, coprime=False), repeats=1)
+    baseline = {"tiny": {"seconds": result.seconds / 10, "peak_bytes": result.peak_bytes}}
+
+    assert result.peak_bytes > 0
+    assert compare([result], baseline) == [
+        f"tiny: {result.seconds / 10:.4f}s -> {result.seconds:.4f}s"]
+    assert compare([Result("other", 1, 1, 1.0, 1.0, 1)], baseline) == []
@@ -0,0 +1,62 @@
+import io
+import json
+
+import pytest
+
+from run_cases import find_cases, main, read_case, run_directory
+
+
+def write_case(directory, number, case, answer):
+    (directory / f"input{number}.txt").write_text(case)
+    (directory / f"output{number}.txt").write_text(answer)
+
+
+def test_read_case_from_stream():
+    n, k, times = read_case(io.BytesIO(b"3 3\n1 1 1\n"))
+
+    assert (n, k, times.tolist()) == (3, 3, [1, 1, 1])
+
+
+@pytest.mark.parametrize("data", [b"3 3\n1 x 1\n", b"3 3\n1 1\n", b"3 3\n1 1 1 1\n", b"3", b""])
+def test_read_case_malformed(data):
+    with pytest.raises(ValueError):
+        read_case(io.BytesIO(data))
+
+
+def test_find_cases_needs_both_files(tmp_path):
+    write_case(tmp_path, "01", "2 4\n10 5\n", "1 20\n")
+    (tmp_path / "input02.txt").write_text("1 1\n1\n")
+
+    assert [name for name, _, _ in find_cases(tmp_path)] == ["input01"]
+
+
+def test_run_directory(tmp_path):
+    write_case(tmp_path, "01", "2 4\n10 5\n", "1 20\n")
+    write_case(tmp_path, "02", "3 3\n1 1 1\n", "2 1\n")
+
+    results = run_directory(tmp_path, workers=2)
+
+    assert [(r["case"], r["passed"], r["answer"]) for r in results] == [
+        ("input01", True, [1, 20]),
+        ("input02", False, [3, 1]),
+    ]
+
+
+def test_run_directory_reports_parse_errors(tmp_path):
+    write_case(tmp_path, "01", "2 4\n10 5\n", "1 20\n")
+    write_case(tmp_path, "02", "3 3\n1 1\n", "2 1\n")
+    write_case(tmp_path, "03", "1 1\n1\n", "1 ?\n")
+
+    results = run_directory(tmp_path, workers=1)
+
+    assert [(r["case"], r["passed"], "error" in r) for r in results] == [
+        ("input01", True, False), ("input02", False, True), ("input03", False, True)]
+
+
+def test_main_reports_json(tmp_path, capsys):
+    write_case(tmp_path, "01", "2 4\n10 5\n", "1 20\n")
+
+    assert main([str(tmp_path), "--workers", "1"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert (report["passed"], report["failed"]) == (1, 0)
+    assert report["cases"][0]["solve_seconds"] >= 0
@@ -0,0 +1,203 @@
+"""Benchmarks the sublinear sortedness tester against a full linear scan.
+
+Arrays of every kind and size are built, the larger ones as memory-mapped
+files, and each one is checked both by `spotCheck` and by the vectorized
+scan `np.all(a[1:] >= a[:-1])`. The three kinds are
+
+* ``sorted``: ``0, 1, ..., n - 1``, which the tester must always accept;
+* ``perturbed``: ``eps n / 4`` random swaps, so the array is unsorted but
+  eps-close to sorted and either verdict is correct;
+* ``adversarial``: the last ``2 eps n`` values rotated to the front. The
+  array is 2eps-far from sorted yet a probe only fails when it lands in the
+  rotated block, which is the tightest case for the tester's bound.
+
+One CSV row is written per (kind, size, eps) with both checks' wall time and
+bytes touched and the tester's false-accept and false-reject rates over
+repeated trials, which is enough to read off the crossover points::
+
+    python3 bench_sortedness.py --max-n 100000000 --csv sortedness.csv
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import List, Optional
+
+import numpy as np
+
+from sortedness import spotCheck
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8, 10 ** 9]
+KINDS = ("sorted", "perturbed", "adversarial")
+EPSILONS = [0.01, 0.001]
+# Arrays above this many elements are written to disk and memory-mapped.
+MEMMAP_ABOVE = 10 ** 6
+# Elements built or scanned at a time, so that neither construction nor the
+# linear scan ever needs more than a few hundred MB of temporaries.
+CHUNK = 1 << 24
+DTYPE = np.int64
+
+
+@dataclass
+class Row:
+    kind: str
+    n: int
+    eps: float
+    storage: str
+    trials: int
+    scan_seconds: float
+    scan_bytes: int
+    scan_sorted: bool
+    tester_seconds: float
+    tester_bytes: int
+    tester_probes: float
+    accept_rate: float
+    false_accept_rate: Optional[float]
+    false_reject_rate: Optional[float]
+
+
+def build(kind: str, n: int, eps: float, seed: int = 0, path: Optional[str] = None) -> np.ndarray:
+    """Builds an array of the given kind, in memory or as a memmap at `path`.
+
+    Values are written `CHUNK` elements at a time, so arrays far larger than
+    memory can be built straight into their file.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind: {kind}")
+    if path is None:
+        array = np.empty(n, dtype=DTYPE)
+    else:
+        array = np.lib.format.open_memmap(path, mode="w+", dtype=DTYPE, shape=(n,))
+
+    # Rotating the top `shift` values to the front moves exactly `shift`
+    # elements out of place; for shift <= n / 2 that is also the distance.
+    shift = min(n // 2, int(np.ceil(2 * eps * n))) if kind == "adversarial" else 0
+    for lo in range(0, n, CHUNK):
+        array[lo:lo + CHUNK] = (np.arange(lo, min(lo + CHUNK, n), dtype=DTYPE) - shift) % n
+
+    if kind == "perturbed":
+        rng = np.random.default_rng(seed)
+        swaps = int(eps * n / 4)
+        picked = np.unique(rng.integers(0, n, size=2 * swaps))
+        rng.shuffle(picked)
+        i, j = picked[:len(picked) // 2], picked[len(picked) // 2:2 * (len(picked) // 2)]
+        array[i], array[j] = array[j], array[i]
+    if path is not None:
+        array.flush()
+    return array
+
+
+def linear_scan(array: np.ndarray) -> bool:
+    """`np.all(a[1:] >= a[:-1])`, evaluated `CHUNK` elements at a time."""
+    for lo in range(0, max(len(array) - 1, 0), CHUNK):
+        window = array[lo:lo + CHUNK + 1]
+        if not np.all(window[1:] >= window[:-1]):
+            return False
+    return True
+
+
+def measure(kind: str, n: int, eps: float, trials: int = 20, seed: int = 0,
+            workdir: Optional[str] = None) -> Row:
+    """Builds one array and times both checks on it.
+
+    The linear scan is exact and reads every element once. The tester runs
+    `trials` times with independent seeds; its time and bytes are averaged
+    and its verdicts give the error rates. False accepts are only possible on
+    adversarial arrays and false rejects only on sorted ones, so the other
+    rate is left empty.
+    """
+    path = None
+    if n > MEMMAP_ABOVE:
+        path = os.path.join(workdir or tempfile.gettempdir(), f"{kind}-{n}-{seed}.npy")
+    array = build(kind, n, eps, seed, path)
+    if path is not None:
+        # Reopen read-only so that the checks fault pages in like a fresh file.
+        del array
+        array = np.load(path, mmap_mode="r")
+    try:
+        started = time.perf_counter()
+        scan_sorted = linear_scan(array)
+        scan_seconds = time.perf_counter() - started
+
+        accepted, seconds, bytes_read, probes = 0, 0.0, 0, 0
+        for trial in range(trials):
+            rng = np.random.default_rng([seed, trial])
+            started = time.perf_counter()
+            check = spotCheck(array, eps, rng)
+            seconds += time.perf_counter() - started
+            accepted += check.sorted
+            bytes_read += check.bytesRead
+            probes += check.probes
+    finally:
+        del array
+        if path is not None:
+            os.remove(path)
+
+    accept_rate = accepted / trials
+    return Row(
+        kind=kind,
+        n=n,
+        eps=eps,
+        storage="memmap" if path is not None else "memory",
+        trials=trials,
+        scan_seconds=scan_seconds,
+        scan_bytes=n * np.dtype(DTYPE).itemsize,
+        scan_sorted=scan_sorted,
+        tester_seconds=seconds / trials,
+        tester_bytes=bytes_read // trials,
+        tester_probes=probes / trials,
+        accept_rate=accept_rate,
+        false_accept_rate=accept_rate if kind == "adversarial" else None,
+        false_reject_rate=1 - accept_rate if kind == "sorted" else None,
+    )
+
+
+def write_csv(rows: List[Row], file):
+    """Writes the rows, one column per `Row` field, to an open text file."""
+    writer = csv.DictWriter(file, fieldnames=[f.name for f in fields(Row)])
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(asdict(row))
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", help="write the results to this file (default: stdout)")
+    parser.add_argument("--max-n", type=int, default=None, help="skip arrays with more elements")
+    parser.add_argument("--eps", type=float, nargs="+", default=EPSILONS)
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--workdir", default=None,
+                        help="directory for the memory-mapped arrays (default: a fresh temporary one)")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="sortedness-")
+    rows = []
+    try:
+        for n in SIZES:
+            if args.max_n is not None and n > args.max_n:
+                continue
+            for eps in args.eps:
+                for kind in KINDS:
+                    row = measure(kind, n, eps, args.trials, workdir=workdir)
+                    rows.append(row)
+                    print(f"{kind:>12} n={n:<11} eps={eps:<7} scan {row.scan_seconds:9.4f}s "
+                          f"tester {row.tester_seconds:9.4f}s  accept {row.accept_rate:.2f}",
+                          file=sys.stderr, flush=True)
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            write_csv(rows, f)
+    else:
+        write_csv(rows, sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
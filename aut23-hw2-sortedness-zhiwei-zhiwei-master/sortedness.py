@@ -1,10 +1,27 @@
+import array as pyarray
+import bisect
 import math
+import mmap
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from math import ceil
 from typing import *
 
+import numpy as np
 
-def isEpsilonSorted(array: List[int], eps: float):
+# array.array typecodes for the NumPy kinds whose values fit them.
+TYPECODES = {"i": "q", "u": "Q", "f": "d"}
+# Probes in the first batch of `spotCheck` on arrays; the rest go in a second.
+FIRST_BATCH = 32
+# Checks of up to this many comparisons (T log n) run as a plain Python loop,
+# which beats the fixed cost of a round of NumPy calls.
+SCALAR_COMPARISONS = 256
+
+
+def isEpsilonSorted(array: List[int], eps: float, rng: Optional[np.random.Generator] = None,
+                    delta: float = 1 / 3, dtype=None):
     """
     Given an array of integers in [n], return True if the array is epsilon sorted.
 
@@ -13,25 +30,277 @@ def isEpsilonSorted(array: List[int], eps: float):
 
     This function should run in sublinear time to the size of the array.
 
+    Sorted arrays are always accepted, and an array that is not epsilon sorted
+    is rejected with probability at least 1 - delta. NumPy arrays, memory maps
+    and other buffer-protocol sequences are handed to
+    `isEpsilonSortedVectorized`, which runs all the probes' searches at once.
+
     Parameters
     ----------
     array : List[int]
         The array that is being checked
     eps : float
         How sorted we check the array to be
+    rng : np.random.Generator, optional
+        Source of the probe indices. Defaults to the `random` module, or a
+        generator seeded from it for large arrays, so `random.seed` keeps
+        runs reproducible.
+    delta : float
+        Allowed probability of accepting an array that is not epsilon sorted
+    dtype : np.dtype, optional
+        Element type of a raw byte buffer such as an `mmap.mmap`; see
+        `asProbeArray`
 
     Returns
     -------
     boolean
         Whether the array is epsilon sorted
     """
+    if not isinstance(array, list):
+        return isEpsilonSortedVectorized(array, eps, rng, delta, dtype)
+    T = trialCount(eps, delta)
+    return T == 0 or _scalarSearch(array, T, rng)
+
+
+def trialCount(eps: float, delta: float = 1 / 3) -> int:
+    """
+    Number of probes that catch an eps-far array with probability 1 - delta.
+
+    A single probe fails on an eps-far array with probability at least eps, so
+    T probes all pass with probability at most (1 - eps)^T <= e^(-eps T),
+    which is at most delta for T = ceil(ln(1 / delta) / eps).
+    """
+    if eps >= 1:
+        return 0
+    if not 0 < delta < 1:
+        raise ValueError("delta must be between 0 and 1.")
+    return ceil(math.log(1 / delta) / eps)
+
+
+@dataclass
+class SpotCheck:
+    """Outcome of one run of the tester, with what it cost."""
+    sorted: bool
+    probes: int
+    comparisons: int
+    elementsRead: int
+    pagesTouched: int
+    bytesRead: int
+
+
+def asProbeArray(array, dtype=None) -> np.ndarray:
+    """
+    Views `array` as a one-dimensional NumPy array without copying it.
+
+    NumPy arrays and memory maps are returned as they are. Typed buffers
+    (`array.array`, a `memoryview` of typed data, ...) are wrapped in place
+    with their own element type. Raw bytes, such as an `mmap.mmap` of a file,
+    carry no element type, so they need `dtype` and are then read with
+    `np.frombuffer`; `dtype` also overrides the type of any other buffer.
+    Only other sequences are copied.
+
+    Raises
+    ------
+    TypeError
+        If `array` is a raw byte buffer and no `dtype` is given.
+    """
+    if isinstance(array, np.ndarray):
+        return array
+    try:
+        view = memoryview(array)
+    except TypeError:
+        return np.asarray(array, dtype=dtype)
+    if dtype is not None:
+        return np.frombuffer(view, dtype=dtype)
+    if view.format in ("B", "c") and not isinstance(array, pyarray.array):
+        raise TypeError(f"A {type(array).__name__} holds raw bytes; pass the dtype of its elements.")
+    return np.asarray(view)
+
+
+def isEpsilonSortedVectorized(array: np.ndarray, eps: float, rng: Optional[np.random.Generator] = None,
+                              delta: float = 1 / 3, dtype=None):
+    """
+    Same tester as `isEpsilonSorted`, for NumPy arrays and other buffers. All
+    T probe indices are drawn at once and their binary searches descend in
+    lockstep, so a check costs O(log n) array operations instead of T
+    interpreted loops. The descent stops at the first search that ends
+    without finding its value. Checks small enough that NumPy's per-call
+    overhead would dominate (`SCALAR_COMPARISONS`) run the scalar loop.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The one-dimensional array that is being checked
+    eps : float
+        How sorted we check the array to be
+    rng : np.random.Generator, optional
+        Source of the probe indices, as in `isEpsilonSorted`
+    delta : float
+        Allowed probability of accepting an array that is not epsilon sorted
+    dtype : np.dtype, optional
+        Element type of a raw byte buffer, as in `isEpsilonSorted`
+
+    Returns
+    -------
+    boolean
+        Whether the array is epsilon sorted
+    """
+    T = trialCount(eps, delta)
+    if T == 0:
+        return True
+    array = asProbeArray(array, dtype)
+    if T * len(array).bit_length() <= SCALAR_COMPARISONS:
+        return _scalarSearch(array, T, rng)
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+    return _allFound(array, rng.integers(0, len(array), size=T))
+
+
+def spotCheck(array, eps: float, rng: Optional[np.random.Generator] = None,
+              delta: float = 1 / 3, dtype=None) -> SpotCheck:
+    """
+    Runs the tester and reports what it cost.
 
-    # TODO: Your code here
+    Both paths stop at the first probe whose search fails. Python lists are
+    probed one at a time. Everything else is viewed with `asProbeArray` and
+    probed in two batches, `FIRST_BATCH` probes and then the rest, so an
+    unsorted array is usually rejected after the first and a sorted one
+    costs two descents. Only the elements on the probes' search paths are
+    read, one sorted batch per level of the search, so on a memory-mapped
+    file the page faults of a level are served in file order and the pages
+    touched stay at O(T log n).
+
+    Parameters
+    ----------
+    array : List[int], np.memmap, np.ndarray or buffer
+        The one-dimensional array that is being checked
+    eps : float
+        How sorted we check the array to be
+    rng : np.random.Generator, optional
+        Source of the probe indices, as in `isEpsilonSorted`
+    delta : float
+        Allowed probability of accepting an array that is not epsilon sorted
+    dtype : np.dtype, optional
+        Element type of a raw byte buffer, as in `isEpsilonSorted`
+
+    Returns
+    -------
+    SpotCheck
+        The verdict together with the probes used, the comparisons made, the
+        distinct elements and pages read and the bytes those pages hold.
+        Pages are only counted for array inputs.
+
+    Counting the reads costs a few passes over every index the searches
+    visit, so `isEpsilonSorted` and `isEpsilonSortedVectorized` skip it.
+    """
+    T = trialCount(eps, delta)
+    if T == 0:
+        return SpotCheck(True, 0, 0, 0, 0, 0)
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+    if isinstance(array, list):
+        return _scalarSpotCheck(array, T, rng)
+
+    array = asProbeArray(array, dtype)
+    probeReads, searchReads = [], []
+    accepted, used = _batchedSearch(array, T, rng, probeReads, searchReads)
+
+    comparisons = sum(len(r) for r in searchReads)
+    elements = np.unique(np.concatenate(probeReads + searchReads))
+    offset = getattr(array, "offset", 0)
+    pages = np.unique((offset + elements * array.strides[0]) // mmap.PAGESIZE)
+    return SpotCheck(accepted, used, comparisons, len(elements), len(pages), len(pages) * mmap.PAGESIZE)
+
+
+def _batchedSearch(array: np.ndarray, T: int, rng: np.random.Generator,
+                   probeReads: Optional[List[np.ndarray]] = None,
+                   searchReads: Optional[List[np.ndarray]] = None) -> Tuple[bool, int]:
+    # Runs T probes in two batches, stopping after the first if one fails.
+    # Returns the verdict and the probes used; the read lists, if given,
+    # collect the probed and compared indices. Memory maps fetch each level's
+    # elements once and in file order, everything else indexes them directly.
+    dedup = isinstance(array, np.memmap)
+    used, accepted = 0, True
+    while used < T and accepted:
+        size = min(FIRST_BATCH, T) if used == 0 else T - used
+        probes = rng.integers(0, len(array), size=size)
+        if probeReads is not None:
+            probeReads.append(probes)
+        if dedup:
+            indices, where = np.unique(probes, return_inverse=True)
+            targets = array[indices][where]
+        else:
+            targets = array[probes]
+        accepted = bool(vectorizedBinarySearch(array, targets, searchReads, dedup).all())
+        used += size
+    return accepted, used
+
+
+def _allFound(array: np.ndarray, probes: np.ndarray) -> bool:
+    # Lockstep binary search for the values at `probes`, as in
+    # `vectorizedBinarySearch`, that only keeps the searches still open and
+    # gives up as soon as one of them closes without a hit.
+    dedup = isinstance(array, np.memmap)
+    if dedup:
+        indices, where = np.unique(probes, return_inverse=True)
+        targets = array[indices][where]
+    else:
+        targets = array[probes]
+    low = np.zeros(len(targets), dtype=np.int64)
+    high = np.full(len(targets), len(array) - 1, dtype=np.int64)
+    while len(targets):
+        mid = (low + high) >> 1
+        if dedup:
+            indices, where = np.unique(mid, return_inverse=True)
+            values = array[indices][where]
+        else:
+            values = array[mid]
+        less = values < targets
+        pending = values != targets
+        low = np.where(less, mid + 1, low)
+        high = np.where(less, high, mid - 1)
+        if (pending & (low > high)).any():
+            return False
+        if not pending.all():
+            low, high, targets = low[pending], high[pending], targets[pending]
+    return True
+
+
+def _binarySearch(a, X) -> bool:
+    low, high = 0, len(a) - 1
+    while low <= high:
+        mid = (low + high) // 2
+        value = a[mid]
+        if value == X:
+            return True
+        elif value < X:
+            low = mid + 1
+        else:
+            high = mid - 1
+    return False
+
+
+def _scalarSearch(array, T: int, rng: Optional[np.random.Generator]) -> bool:
+    # The original tester: one search per probe, with the indices drawn from
+    # the `random` module unless a generator is given.
+    if rng is None:
+        indices = (random.randrange(len(array)) for _ in range(T))
+    else:
+        indices = rng.integers(0, len(array), size=T).tolist()
+    return all(_binarySearch(array, array[index]) for index in indices)
+
+
+def _scalarSpotCheck(array: List[int], T: int, rng: np.random.Generator) -> SpotCheck:
+    read = set()
+    comparisons = 0
 
     def binarySearch(a, X):
+        nonlocal comparisons
         low, high = 0, len(a) - 1
         while low <= high:
             mid = (low + high) // 2
+            read.add(mid)
+            comparisons += 1
             if a[mid] == X:
                 return True
             elif a[mid] < X:
@@ -40,13 +309,394 @@ def isEpsilonSorted(array: List[int], eps: float):
                 high = mid - 1
         return False
 
-    T = ceil(math.log(3) / eps)
-    for t in range(T):
-        if eps >= 1: return True
-        rand_choose = array[random.randint(0, len(array) - 1)]
-        if not binarySearch(array, rand_choose):
-            return False
-    return True
+    for t, index in enumerate(rng.integers(0, len(array), size=T).tolist(), 1):
+        read.add(index)
+        if not binarySearch(array, array[index]):
+            return SpotCheck(False, t, comparisons, len(read), 0, 0)
+    return SpotCheck(True, T, comparisons, len(read), 0, 0)
+
+
+def vectorizedBinarySearch(a: np.ndarray, targets: np.ndarray, reads: Optional[List[np.ndarray]] = None,
+                           dedup: bool = False) -> np.ndarray:
+    """
+    Runs the textbook binary search for every target at once.
+
+    Each round compares the middle element of every still-open search with
+    its target and narrows all of them together, following exactly the steps
+    the scalar search would take.
+
+    Parameters
+    ----------
+    a : np.ndarray
+        The array being searched
+    targets : np.ndarray
+        The values to look for
+    reads : List[np.ndarray], optional
+        If given, every round appends the index it compared for each open
+        search, so the total length is the number of comparisons
+    dedup : bool
+        Fetch the middle elements of a round once each and in index order.
+        That costs a sort per round, and pays off when every read can be a
+        page fault, as on a memory map.
+
+    Returns
+    -------
+    np.ndarray
+        Boolean array, True where the search for that target found it
+    """
+    found = np.zeros(len(targets), dtype=bool)
+    low = np.zeros(len(targets), dtype=np.int64)
+    high = np.full(len(targets), len(a) - 1, dtype=np.int64)
+    pending = np.flatnonzero(low <= high)
+    while pending.size:
+        lo, hi, x = low[pending], high[pending], targets[pending]
+        mid = (lo + hi) // 2
+        if dedup:
+            indices, where = np.unique(mid, return_inverse=True)
+            values = a[indices][where]
+        else:
+            values = a[mid]
+        if reads is not None:
+            reads.append(mid)
+        hit = values == x
+        found[pending[hit]] = True
+        less = values < x
+        low[pending] = np.where(less, mid + 1, lo)
+        high[pending] = np.where(less, hi, mid - 1)
+        pending = pending[~hit & (low[pending] <= high[pending])]
+    return found
+
+def distanceToSorted(array, returnViolations: bool = False, chunkSize: Optional[int] = None, dtype=None):
+    """
+    Computes exactly how far an array is from sorted: the smallest fraction of
+    its entries that has to change to make it non-decreasing.
+
+    That is 1 - L / n for the length L of the longest non-decreasing
+    subsequence, found by patience sorting in O(n log n). The piles' top
+    values live in a typed `array.array` for signed, unsigned and float
+    input, so the state costs 8 bytes per pile.
+
+    Memory is O(L), not O(chunk): there is one pile per element of the
+    longest subsequence, so on a nearly sorted array the piles grow to
+    almost the size of the input even when it is streamed. Chunking keeps
+    the input itself out of RAM, but not the piles.
+
+    Parameters
+    ----------
+    array : np.ndarray, np.memmap, buffer, List[int] or iterable of chunks
+        The values to measure. With `chunkSize`, an indexable array is read
+        one slice at a time, which keeps a memory-mapped file out of RAM; any
+        other iterable is treated as a stream of chunks.
+    returnViolations : bool
+        Also return the positions outside one longest non-decreasing
+        subsequence, i.e. a smallest set of entries whose change sorts the
+        array. Needs O(n) extra memory, so it cannot be combined with
+        `chunkSize`.
+    chunkSize : int, optional
+        Stream the input in slices of this many elements. This bounds the
+        memory for the input, not for the O(L) piles.
+    dtype : np.dtype, optional
+        Element type of a raw byte buffer, as in `isEpsilonSorted`
+
+    Returns
+    -------
+    float or Tuple[float, np.ndarray]
+        The distance, and the violating positions if requested
+    """
+    if returnViolations and chunkSize is not None:
+        raise ValueError("returnViolations needs the whole array; it cannot be chunked.")
+    try:
+        memoryview(array)
+    except TypeError:
+        pass
+    else:
+        # View buffers as typed elements first: slices of raw bytes would be
+        # counted in bytes and could split an element.
+        array = asProbeArray(array, dtype)
+
+    if chunkSize is not None:
+        if hasattr(array, "__getitem__") and hasattr(array, "__len__"):
+            chunks = (array[i:i + chunkSize] for i in range(0, len(array), chunkSize))
+        else:
+            chunks = iter(array)
+    else:
+        chunks = iter([array])
+
+    tails, tailPositions = None, []
+    predecessors = np.empty(len(array), dtype=np.int64) if returnViolations else None
+    n = 0
+    for chunk in chunks:
+        chunk = asProbeArray(chunk, dtype)
+        if tails is None:
+            kind = chunk.dtype.kind
+            tails = pyarray.array(TYPECODES[kind]) if kind in TYPECODES else []
+        for value in chunk.tolist():
+            j = bisect.bisect_right(tails, value)
+            if j == len(tails):
+                tails.append(value)
+                if returnViolations:
+                    tailPositions.append(n)
+            else:
+                tails[j] = value
+                if returnViolations:
+                    tailPositions[j] = n
+            if returnViolations:
+                predecessors[n] = tailPositions[j - 1] if j > 0 else -1
+            n += 1
+
+    if n == 0:
+        return (0.0, np.empty(0, dtype=np.int64)) if returnViolations else 0.0
+    distance = 1 - len(tails) / n
+    if not returnViolations:
+        return distance
+
+    keep = np.zeros(n, dtype=bool)
+    position = tailPositions[-1]
+    while position >= 0:
+        keep[position] = True
+        position = predecessors[position]
+    return distance, np.flatnonzero(~keep)
+
+
+@dataclass
+class ShardSummary:
+    """What a worker reports back about one shard."""
+    length: int
+    minimum: Any
+    maximum: Any
+    probes: int
+    failures: int
+
+    @property
+    def violationEstimate(self) -> float:
+        """Fraction of this shard's probes whose binary search failed."""
+        return self.failures / self.probes if self.probes else 0.0
+
+
+@dataclass
+class ShardedCheck:
+    """Outcome of `verifyShards`."""
+    sorted: bool
+    shards: List[ShardSummary]
+    boundaryViolations: List[int]
+    violationEstimate: float
+
+
+def verifyShards(shards: Sequence, eps: float, workers: Optional[int] = None,
+                 rng: Optional[np.random.Generator] = None, delta: float = 1 / 3) -> ShardedCheck:
+    """
+    Tests whether the concatenation of `shards` is epsilon sorted, checking
+    every shard in its own worker process.
+
+    The `trialCount(eps, delta)` probes are split across shards in proportion to
+    their length and each worker runs its share with the vectorized binary
+    search, inside its shard only. Workers also return their shard's minimum
+    and maximum. If each shard's range ends where the next one begins, fixing
+    every shard on its own sorts the whole array, so the per-shard distances
+    add up to at least eps. The proportional probes then catch an eps-far
+    array with probability at least 1 - delta, as the single-array tester does.
+    When eps >= 1 there is nothing to test, and the shards are accepted
+    without starting any workers.
+
+    Parameters
+    ----------
+    shards : Sequence
+        The shards in order, each a one-dimensional array or the path of a
+        `.npy` file. Paths are memory-mapped by the worker, so the data never
+        travels between processes.
+    eps : float
+        How sorted we check the array to be
+    workers : int, optional
+        Size of the process pool, one per CPU by default
+    rng : np.random.Generator, optional
+        Source of the per-shard seeds, seeded from the `random` module by
+        default
+    delta : float
+        Allowed probability of accepting an array that is not epsilon sorted
+
+    Returns
+    -------
+    ShardedCheck
+        The verdict, every shard's summary, the indices k where shard k
+        overlaps shard k + 1, and the length-weighted violation estimate
+    """
+    lengths = [len(_loadShard(shard)) for shard in shards]
+    T = trialCount(eps, delta)
+    if T == 0:
+        return ShardedCheck(True, [ShardSummary(length, None, None, 0, 0) for length in lengths], [], 0.0)
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+    total = sum(lengths)
+    probes = [ceil(T * length / total) if total else 0 for length in lengths]
+    seeds = rng.integers(0, 2 ** 63, size=len(shards)).tolist()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        summaries = list(pool.map(_checkShard, shards, probes, seeds))
+
+    filled = [k for k, summary in enumerate(summaries) if summary.length]
+    boundaries = [k for k, nxt in zip(filled, filled[1:])
+                  if summaries[k].maximum > summaries[nxt].minimum]
+    estimate = sum(s.violationEstimate * s.length for s in summaries) / total if total else 0.0
+    accepted = not boundaries and all(summary.failures == 0 for summary in summaries)
+    return ShardedCheck(accepted, summaries, boundaries, estimate)
+
+
+def _loadShard(shard) -> np.ndarray:
+    if isinstance(shard, (str, os.PathLike)):
+        return np.load(shard, mmap_mode="r")
+    return asProbeArray(shard)
+
+
+def _checkShard(shard, probes: int, seed: int) -> ShardSummary:
+    array = _loadShard(shard)
+    if len(array) == 0:
+        return ShardSummary(0, None, None, 0, 0)
+    indices = np.unique(np.random.default_rng(seed).integers(0, len(array), size=probes),
+                        return_inverse=True)
+    found = vectorizedBinarySearch(array, array[indices[0]][indices[1]])
+    return ShardSummary(len(array), array.min().item(), array.max().item(),
+                        probes, int(probes - found.sum()))
+
+
+class SortednessMonitor:
+    """
+    Keeps an epsilon-sortedness verdict for an append-only sequence without
+    storing the sequence.
+
+    The tester runs its binary searches on a fixed implicit search tree over
+    positions [0, 2^M), where positions that have not arrived yet count as
+    +infinity. A sorted prefix padded that way is still sorted, so sorted
+    streams are always accepted. Positions are grouped into blocks that
+    double in size ({0}, {1}, [2, 4), [4, 8), ...), and the search path of a
+    position only visits its own block and the first element of every later
+    block. When a block opens, the monitor draws T probe positions inside it
+    and from then on keeps just the stream values those probes' searches need.
+
+    Every block gets T probes, so a stream that is eps-far from sorted is
+    rejected with probability at least 1 - delta, just like `isEpsilonSorted`. The
+    state holds O(T log^2 n) values however long the stream gets, and a
+    verdict costs O(T log^2 n) comparisons.
+
+    A probe passes when its search meets its own value on the way down.
+    Unlike the plain binary search, a search that turns away from the probe's
+    position counts as a failure even if an equal value sits in the other
+    subtree, which only matters when the stream repeats values.
+    """
+
+    def __init__(self, eps: float, rng: Optional[np.random.Generator] = None, delta: float = 1 / 3):
+        """
+        Parameters
+        ----------
+        eps : float
+            How sorted we check the stream to be
+        rng : np.random.Generator, optional
+            Source of the probe positions, seeded from the `random` module by
+            default
+        delta : float
+            Allowed probability of accepting a stream that is not epsilon sorted
+        """
+        self.eps = eps
+        self.T = trialCount(eps, delta)
+        self.rng = np.random.default_rng(random.getrandbits(64)) if rng is None else rng
+        self.length = 0
+        # starts[k] is the first value of block k (position 2^(k-1)).
+        self.starts = [None]
+        # Per block: probe positions, the positions their searches need, and
+        # the values seen at those positions (None until they arrive).
+        self.blocks: List[Tuple[List[int], Dict[int, int], List[Any]]] = []
+        # Needed positions of the open block, and how many have arrived.
+        self._positions: List[int] = []
+        self._cursor = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def storedValues(self) -> int:
+        """How many stream values the monitor is holding on to."""
+        return len(self.starts) + sum(len(values) for _, _, values in self.blocks)
+
+    def extend(self, chunk: Sequence):
+        """
+        Appends a chunk of values to the monitored stream.
+
+        Parameters
+        ----------
+        chunk : Sequence
+            The next values of the stream, e.g. a list or NumPy array
+        """
+        offset = 0
+        while offset < len(chunk):
+            position = self.length + offset
+            block = position.bit_length()
+            if block == len(self.blocks):
+                self._openBlock(block)
+                if block > 0:
+                    self.starts.append(chunk[offset])
+            end = min(len(chunk), (1 << block) - self.length)
+            self._capture(chunk, self.length + end)
+            offset = end
+        self.length += len(chunk)
+
+    def isEpsilonSorted(self) -> bool:
+        """
+        Returns the tester's verdict on everything appended so far.
+
+        Returns
+        -------
+        boolean
+            Whether the stream is epsilon sorted
+        """
+        top = (self.length - 1).bit_length()
+        for block, (probes, index, values) in enumerate(self.blocks):
+            for p in probes:
+                if p < self.length and not self._passes(p, block, top, index, values):
+                    return False
+        return True
+
+    def _openBlock(self, block: int):
+        low, high = (0, 1) if block == 0 else (1 << (block - 1), 1 << block)
+        # Repeated draws would only repeat the same search, so keep each
+        # position once; small blocks end up fully covered.
+        probes = np.unique(self.rng.integers(low, high, size=self.T)).tolist()
+        needed = set(probes)
+        for p in probes:
+            needed.update(_midpoint(p, k) for k in range(1, block))
+        positions = sorted(needed)
+        self.blocks.append((probes, {p: i for i, p in enumerate(positions)}, [None] * len(positions)))
+        self._positions = positions
+        self._cursor = 0
+
+    def _capture(self, chunk: Sequence, end: int):
+        # Copy the values the open block's probes need, up to position `end`,
+        # out of a chunk that starts at position `self.length`.
+        _, _, values = self.blocks[-1]
+        positions, i = self._positions, self._cursor
+        while i < len(positions) and positions[i] < end:
+            values[i] = chunk[positions[i] - self.length]
+            i += 1
+        self._cursor = i
+
+    def _passes(self, p: int, block: int, top: int, index: Dict[int, int], values: List[Any]) -> bool:
+        target = values[index[p]]
+        for k in range(top, 0, -1):
+            m = _midpoint(p, k)
+            if k >= block:
+                value = self.starts[k] if k < len(self.starts) else None
+            else:
+                value = values[index[m]]
+            if value == target:
+                return True
+            # Unseen positions are +infinity: the search heads left.
+            if (value is None or target < value) != (p < m):
+                return False
+        return True
+
+
+def _midpoint(p: int, k: int) -> int:
+    """Middle position of the size-2^k node of the search tree that holds `p`."""
+    return ((p >> k) << k) + (1 << (k - 1))
+
 
 # if __name__ == '__main__':
 #     isEpsilonSorted([1,2,3,4,2,6,7,8], 0.2)
@@ -0,0 +1,54 @@
+import csv
+import io
+
+import numpy as np
+import pytest
+
+import bench_sortedness
+from bench_sortedness import build, linear_scan, measure, write_csv
+from sortedness import distanceToSorted
+
+
+def test_build_kinds(tmp_path):
+    n, eps = 4000, 0.01
+
+    assert np.array_equal(build("sorted", n, eps), np.arange(n))
+    perturbed = build("perturbed", n, eps, seed=3)
+    assert not linear_scan(perturbed)
+    assert 0 < round(distanceToSorted(perturbed) * n) <= eps * n / 2
+    adversarial = build("adversarial", n, eps, path=str(tmp_path / "a.npy"))
+    assert isinstance(adversarial, np.memmap)
+    assert distanceToSorted(adversarial) == pytest.approx(2 * eps)
+    assert sorted(adversarial.tolist()) == list(range(n))
+
+
+def test_linear_scan_chunks(monkeypatch):
+    monkeypatch.setattr(bench_sortedness, "CHUNK", 7)
+    array = np.arange(50)
+
+    assert linear_scan(array)
+    for i in (0, 6, 7, 48):
+        broken = array.copy()
+        broken[i], broken[i + 1] = broken[i + 1], broken[i]
+        assert not linear_scan(broken)
+
+
+def test_measure_rates(monkeypatch, tmp_path):
+    monkeypatch.setattr(bench_sortedness, "MEMMAP_ABOVE", 10 ** 4)
+    sorted_row = measure("sorted", 10 ** 5, 0.01, trials=5, workdir=str(tmp_path))
+    far_row = measure("adversarial", 10 ** 3, 0.05, trials=20)
+
+    assert sorted_row.storage == "memmap" and list(tmp_path.iterdir()) == []
+    assert sorted_row.scan_sorted and sorted_row.false_reject_rate == 0
+    assert 0 < sorted_row.tester_bytes < sorted_row.scan_bytes
+    assert far_row.storage == "memory" and not far_row.scan_sorted
+    assert far_row.false_accept_rate <= 1 / 3 and far_row.false_reject_rate is None
+
+
+def test_write_csv():
+    out = io.StringIO()
+    write_csv([measure("perturbed", 1000, 0.1, trials=2)], out)
+
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert len(rows) == 1
+    assert rows[0]["kind"] == "perturbed" and rows[0]["false_accept_rate"] == ""
@@ -1,7 +1,13 @@
+import array as pyarray
+import mmap
 import random
+
+import numpy as np
 import pytest
 
-from sortedness import isEpsilonSorted
+import sortedness
+from sortedness import (SortednessMonitor, distanceToSorted, isEpsilonSorted, spotCheck,
+                        trialCount, vectorizedBinarySearch, verifyShards)
 
 
 SEED = 17
@@ -87,3 +93,285 @@ def test_solve(file_io):
     # that this part of the test should pass.
     results = [isEpsilonSorted(array, 10 * epsilon) for (array, epsilon) in inputs]
     assert any(results), 'None of the tests returned True'
+
+
+@pytest.mark.execution_timeout(TIMEOUT)
+def test_solve_vectorized(file_io):
+    inputs = [(np.array(array), epsilon) for (array, epsilon) in file_io]
+
+    results = [isEpsilonSorted(array, epsilon) for (array, epsilon) in inputs]
+    assert not all(results), 'All the tests returned True'
+
+    results = [isEpsilonSorted(array, 10 * epsilon) for (array, epsilon) in inputs]
+    assert any(results), 'None of the tests returned True'
+
+
+def test_vectorized_binary_search():
+    rng = np.random.default_rng(SEED)
+    array = rng.integers(0, 50, size=1000)
+    targets = rng.integers(0, 60, size=500)
+
+    def binary_search(a, x):
+        low, high = 0, len(a) - 1
+        while low <= high:
+            mid = (low + high) // 2
+            if a[mid] == x:
+                return True
+            elif a[mid] < x:
+                low = mid + 1
+            else:
+                high = mid - 1
+        return False
+
+    found = vectorizedBinarySearch(array, targets)
+    assert found.tolist() == [binary_search(array, x) for x in targets]
+
+
+def test_sorted_always_accepted():
+    array = np.repeat(np.arange(1000), 3)
+    assert all(isEpsilonSorted(array, 0.001, np.random.default_rng(s)) for s in range(20))
+
+
+def test_memmap_reads_few_pages(tmp_path):
+    n = 2 ** 22
+    path = tmp_path / "sorted.bin"
+    np.arange(n, dtype=np.int64).tofile(path)
+    array = np.memmap(path, dtype=np.int64, mode="r")
+
+    check = spotCheck(array, 0.01, np.random.default_rng(SEED))
+
+    assert check.sorted
+    assert check.probes == 110
+    # Every probe reads at most one element per level of the search.
+    assert check.elementsRead <= check.probes * 23
+    assert check.bytesRead == check.pagesTouched * mmap.PAGESIZE
+    assert check.bytesRead < array.nbytes // 4
+
+
+def test_buffer_protocol_inputs():
+    rng = np.random.default_rng(SEED)
+    reversed_values = pyarray.array("q", range(10000, 0, -1))
+
+    assert isEpsilonSorted(pyarray.array("q", range(10000)), 0.01, rng)
+    assert not isEpsilonSorted(reversed_values, 0.01, rng)
+    assert not isEpsilonSorted(memoryview(reversed_values), 0.01, rng)
+
+
+def test_raw_mmap_input(tmp_path):
+    path = tmp_path / "sorted.bin"
+    (np.arange(1000, dtype=np.int64) * 1000).tofile(path)
+    rng = np.random.default_rng(SEED)
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        # The bytes of a file say nothing about its element type.
+        with pytest.raises(TypeError):
+            isEpsilonSorted(mapped, 0.05, rng)
+        assert all(isEpsilonSorted(mapped, 0.05, rng, dtype=np.int64) for _ in range(10))
+        assert spotCheck(mapped, 0.05, rng, dtype=np.int64).sorted
+        assert distanceToSorted(mapped, chunkSize=100, dtype=np.int64) == 0.0
+        assert len(sortedness.asProbeArray(mapped, np.int64)) == 1000
+
+
+def stream(monitor, array, rng):
+    i = 0
+    while i < len(array):
+        size = rng.randint(1, 5000)
+        monitor.extend(array[i:i + size])
+        i += size
+
+
+def test_monitor_accepts_sorted_stream():
+    rng = random.Random(SEED)
+    monitor = SortednessMonitor(0.01, np.random.default_rng(SEED))
+    array = np.arange(200000)
+
+    i = 0
+    while i < len(array):
+        size = rng.randint(1, 20000)
+        monitor.extend(array[i:i + size])
+        i += size
+        assert monitor.isEpsilonSorted()
+    assert len(monitor) == len(array)
+
+
+def test_monitor_memory_is_bounded():
+    monitor = SortednessMonitor(0.05)
+    monitor.extend(list(range(2 ** 20)))
+
+    # T probes in each of the 21 blocks, each needing at most 21 values.
+    blocks = 21
+    assert monitor.storedValues <= monitor.T * blocks * blocks + blocks
+    assert monitor.storedValues < 2 ** 20 // 100
+
+
+def test_monitor_rejects_far_stream():
+    rng = random.Random(SEED)
+    # Swapping neighbours leaves the stream 1/2-far from sorted.
+    array = np.arange(100000).reshape(-1, 2)[:, ::-1].ravel()
+
+    results = []
+    for seed in range(20):
+        monitor = SortednessMonitor(0.1, np.random.default_rng(seed))
+        stream(monitor, array, rng)
+        results.append(monitor.isEpsilonSorted())
+    assert sum(results) <= 20 // 3
+
+
+@pytest.mark.parametrize("n,epsilon", [(100, 0.1), (1000, 0.2), (5000, 0.05), (300, 0.7)])
+def test_distance_to_sorted(n, epsilon):
+    array = generate_array(n, epsilon)
+
+    distance, violations = distanceToSorted(np.array(array), returnViolations=True)
+
+    assert distance == pytest.approx(how_sorted(array))
+    assert len(violations) == round(distance * n)
+    rest = np.delete(np.array(array), violations)
+    assert np.all(rest[1:] >= rest[:-1])
+
+
+def test_distance_to_sorted_chunked(tmp_path):
+    array = np.array(generate_array(20000, 0.05), dtype=np.int64)
+    path = tmp_path / "array.bin"
+    array.tofile(path)
+    mapped = np.memmap(path, dtype=np.int64, mode="r")
+    chunks = iter([array[:7], array[7:12345], array[12345:]])
+
+    expected = distanceToSorted(array)
+    assert distanceToSorted(mapped, chunkSize=1000) == expected
+    assert distanceToSorted(chunks, chunkSize=1) == expected
+    with pytest.raises(ValueError):
+        distanceToSorted(mapped, returnViolations=True, chunkSize=1000)
+
+
+def test_distance_to_sorted_duplicates():
+    assert distanceToSorted([3, 3, 3]) == 0
+    assert distanceToSorted([]) == 0
+    assert distanceToSorted(np.array([2.0, 1.0, 1.0, 3.0])) == 0.25
+
+
+def write_shards(tmp_path, array, count):
+    paths = []
+    for k, shard in enumerate(np.array_split(array, count)):
+        paths.append(str(tmp_path / f"shard{k}.npy"))
+        np.save(paths[-1], shard)
+    return paths
+
+
+def test_sharded_sorted(tmp_path):
+    paths = write_shards(tmp_path, np.arange(100000), 5)
+
+    check = verifyShards(paths, 0.01, workers=2, rng=np.random.default_rng(SEED))
+
+    assert check.sorted
+    assert check.boundaryViolations == []
+    assert [s.length for s in check.shards] == [20000] * 5
+    assert sum(s.probes for s in check.shards) >= 110
+
+
+def test_sharded_boundary_overlap(tmp_path):
+    array = np.arange(100000)
+    array[39999] = 10 ** 9  # last element of shard 1
+    paths = write_shards(tmp_path, array, 5)
+
+    check = verifyShards(paths, 0.01, workers=2)
+
+    assert not check.sorted
+    assert check.boundaryViolations == [1]
+
+
+def test_sharded_far(tmp_path):
+    array = np.arange(100000).reshape(-1, 2)[:, ::-1].ravel()
+    shards = np.array_split(array, 4)
+
+    check = verifyShards(shards, 0.1, workers=2, rng=np.random.default_rng(SEED))
+
+    assert not check.sorted
+    assert check.violationEstimate > 0.1
+
+
+def test_trial_count():
+    assert trialCount(0.1) == 11
+    assert trialCount(0.1, delta=1e-6) == 139
+    assert trialCount(1.5) == 0
+    with pytest.raises(ValueError):
+        trialCount(0.1, delta=0)
+
+
+@pytest.mark.parametrize("as_array", [False, True])
+def test_spot_check_seeded_and_early_exit(as_array):
+    ascending, descending = list(range(5000)), list(range(5000, 0, -1))
+    if as_array:
+        ascending, descending = np.array(ascending), np.array(descending)
+
+    first = spotCheck(ascending, 0.01, np.random.default_rng(SEED), 1e-6)
+    second = spotCheck(ascending, 0.01, np.random.default_rng(SEED), 1e-6)
+    rejected = spotCheck(descending, 0.01, np.random.default_rng(SEED), 1e-6)
+
+    assert first == second
+    assert first.sorted and first.probes == trialCount(0.01, 1e-6)
+    assert first.comparisons >= first.probes
+    assert not rejected.sorted
+    assert rejected.probes < first.probes
+
+
+def test_smaller_delta_rejects_more():
+    array = np.arange(100000).reshape(-1, 100)[:, ::-1].ravel()
+    loose = [isEpsilonSorted(array, 0.5, np.random.default_rng(s), delta=0.5) for s in range(200)]
+    tight = [isEpsilonSorted(array, 0.5, np.random.default_rng(s), delta=1e-3) for s in range(200)]
+
+    assert sum(tight) <= sum(loose)
+    assert sum(tight) <= 2
+
+
+def test_verdict_matches_binary_search():
+    rng = np.random.default_rng(SEED)
+    for _ in range(200):
+        array = np.sort(rng.integers(0, 100, size=int(rng.integers(1, 300))))
+        array[rng.integers(0, len(array), size=3)] = rng.integers(0, 100, size=3)
+        probes = rng.integers(0, len(array), size=40)
+
+        expected = vectorizedBinarySearch(array, array[probes]).all()
+        assert sortedness._allFound(array, probes) == expected
+
+
+class CountingArray(np.ndarray):
+    """Counts the reads at arrays of indices, one per round of a lockstep search."""
+    reads = 0
+
+    def __getitem__(self, key):
+        if isinstance(key, np.ndarray) and key.dtype.kind in "iu":
+            CountingArray.reads += 1
+        return super().__getitem__(key)
+
+
+def test_vectorized_descends_in_lockstep(monkeypatch):
+    # On a large sorted array every probe runs to the bottom, and all of
+    # them must do it together in about log2 n rounds, not one by one.
+    def scalar(*args):
+        raise AssertionError("large checks must not fall back to the scalar loop")
+
+    monkeypatch.setattr(sortedness, "_scalarSearch", scalar)
+    monkeypatch.setattr(CountingArray, "reads", 0)
+    n = 10 ** 6
+    array = np.arange(n).view(CountingArray)
+
+    assert isEpsilonSorted(array, 1e-3, np.random.default_rng(SEED))
+    # One read for the probed values, then one per level of the search.
+    assert 1 < CountingArray.reads <= 1 + n.bit_length()
+
+
+def test_distance_to_sorted_unsigned():
+    array = np.array(generate_array(5000, 0.05), dtype=np.uint64)
+    array[0] = 2 ** 64 - 1
+
+    assert distanceToSorted(array, chunkSize=1000) == distanceToSorted(array.astype(object).tolist())
+
+
+def test_sharded_accepts_when_eps_at_least_one():
+    array = np.arange(1000)[::-1]
+
+    check = verifyShards(np.array_split(array, 2), 1.5)
+
+    assert check.sorted == isEpsilonSorted(array, 1.5) == True
+    assert [s.length for s in check.shards] == [500, 500]
+    assert sum(s.probes for s in check.shards) == 0
@@ -0,0 +1,159 @@
+"""Prime generation benchmark across bit lengths.
+
+For every bit length, `trials` primes are generated with
+`primality.generate_prime` and each one's tries, Miller-Rabin tests,
+modular exponentiations and wall time (`time.perf_counter_ns`) are
+recorded. Bit lengths run in parallel worker processes. The samples go to
+JSON or CSV, and the mean time per bit length is fitted to
+``c * bits**k`` so that the notebook's O(log^3.58 n) claim can be checked
+on the machine at hand::
+
+    python3 bench_primes.py --max-bits 2048 --workers 4 --csv primes.csv
+"""
+import argparse
+import csv
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, List, Optional, Tuple
+
+from primality import generate_prime
+
+BIT_LENGTHS = list(range(64, 1025, 64))
+TRIALS = 25
+# Exponent of log n predicted by the notebook: O(log n) tries, each a
+# modular exponentiation of O(log n) Karatsuba multiplications.
+PREDICTED_EXPONENT = 3.58
+
+
+@dataclass
+class Sample:
+    bits: int
+    trial: int
+    tries: int
+    tested: int
+    modexps: int
+    nanoseconds: int
+
+
+def sample_bit_length(bits: int, trials: int = TRIALS, seed: int = 0) -> List[Sample]:
+    """Generates `trials` primes of one bit length and times each of them on its own."""
+    rng = random.Random(f"{seed}-{bits}")
+    # Untimed warm-up: the first call in a process pays for importing numpy.
+    generate_prime(16, rng=random.Random(seed))
+    samples = []
+    for trial in range(trials):
+        started = time.perf_counter_ns()
+        search = generate_prime(bits, rng=rng)
+        elapsed = time.perf_counter_ns() - started
+        samples.append(Sample(bits, trial, search.tries, search.tested, search.modexps, elapsed))
+    return samples
+
+
+def run(bit_lengths: List[int], trials: int = TRIALS, workers: Optional[int] = None,
+        seed: int = 0) -> List[Sample]:
+    """Samples every bit length, one task per bit length on `workers` processes
+    (one per CPU by default; 1 runs them inline)."""
+    tasks = [(bits, trials, seed) for bits in bit_lengths]
+    if workers == 1:
+        batches = [sample_bit_length(*task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batches = list(pool.map(sample_bit_length, *zip(*tasks)))
+    return [sample for batch in batches for sample in batch]
+
+
+def summarize(samples: List[Sample]) -> Dict[int, dict]:
+    """Mean and standard deviation of tries, modexps and seconds per bit length."""
+    by_bits: Dict[int, List[Sample]] = {}
+    for sample in samples:
+        by_bits.setdefault(sample.bits, []).append(sample)
+    summary = {}
+    for bits, group in sorted(by_bits.items()):
+        row = {"trials": len(group)}
+        for name, values in (("tries", [s.tries for s in group]),
+                             ("modexps", [s.modexps for s in group]),
+                             ("seconds", [s.nanoseconds / 1e9 for s in group])):
+            mean = sum(values) / len(values)
+            row[f"{name}_mean"] = mean
+            row[f"{name}_std"] = math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+        summary[bits] = row
+    return summary
+
+
+def fit_exponent(summary: Dict[int, dict]) -> Tuple[float, float]:
+    """Least-squares fit of ``seconds = c * bits**k`` on a log-log scale.
+
+    Returns
+    -------
+    Tuple[float, float]
+        The exponent `k` and the constant `c`.
+    """
+    points = [(math.log(bits), math.log(row["seconds_mean"]))
+              for bits, row in summary.items() if row["seconds_mean"] > 0]
+    if len(points) < 2:
+        raise ValueError("Need at least two bit lengths to fit an exponent.")
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    k = (sum((x - mean_x) * (y - mean_y) for x, y in points)
+         / sum((x - mean_x) ** 2 for x, _ in points))
+    return k, math.exp(mean_y - k * mean_x)
+
+
+def write_csv(samples: List[Sample], file):
+    """Writes one row per generated prime to an open text file."""
+    writer = csv.DictWriter(file, fieldnames=[f.name for f in fields(Sample)])
+    writer.writeheader()
+    for sample in samples:
+        writer.writerow(asdict(sample))
+
+
+def write_json(samples: List[Sample], file):
+    """Writes the samples, the per-bit-length summary and the fit to an open text file."""
+    summary = summarize(samples)
+    k, c = fit_exponent(summary) if len(summary) > 1 else (None, None)
+    json.dump({
+        "samples": [asdict(sample) for sample in samples],
+        "summary": {str(bits): row for bits, row in summary.items()},
+        "fit": {"exponent": k, "constant": c, "predicted_exponent": PREDICTED_EXPONENT},
+    }, file, indent=2)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-bits", type=int, default=BIT_LENGTHS[0])
+    parser.add_argument("--max-bits", type=int, default=BIT_LENGTHS[-1])
+    parser.add_argument("--step", type=int, default=BIT_LENGTHS[1] - BIT_LENGTHS[0])
+    parser.add_argument("--trials", type=int, default=TRIALS, help="primes per bit length")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write samples, summary and fit to this JSON file")
+    parser.add_argument("--csv", help="write one row per generated prime to this CSV file")
+    args = parser.parse_args(argv)
+
+    bit_lengths = list(range(args.min_bits, args.max_bits + 1, args.step))
+    samples = run(bit_lengths, args.trials, args.workers, args.seed)
+    summary = summarize(samples)
+    for bits, row in summary.items():
+        print(f"{bits:6d} bits  {row['tries_mean']:9.1f} tries  {row['modexps_mean']:7.1f} modexps  "
+              f"{row['seconds_mean']:9.4f}s +- {row['seconds_std']:.4f}s")
+    if len(summary) > 1:
+        k, c = fit_exponent(summary)
+        print(f"seconds ~ {c:.3g} * bits^{k:.2f} (predicted exponent {PREDICTED_EXPONENT})")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            write_json(samples, f)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            write_csv(samples, f)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,686 @@
+"""Primality testing routines shared by the primality notebook and scripts.
+
+`fermat_is_prime` and `boosted_fermat` are the notebook's Fermat tests.
+`miller_rabin` replaces the boosted Fermat test: it is never fooled by
+Carmichael numbers and, below 2**64, it is deterministic. For many small
+numbers at once there is a segmented sieve of Eratosthenes (`iter_primes`,
+`primes_in_range`, `PrimeSieve`) that only stores odd numbers, and
+`carmichael_numbers` enumerates the composites that fool the Fermat test.
+`generate_prime` finds random primes of a given bit length, sieving runs of
+candidates so that Miller-Rabin only sees the few without small factors;
+`generate_prime_parallel` races one such search per CPU. `is_prime_array`
+runs a deterministic Miller-Rabin on whole arrays of 64-bit integers.
+
+Importing the module does no work beyond defining it: numpy and the process
+pool machinery are only imported by the functions that need them, so scalar
+users such as `miller_rabin` never pay for them.
+"""
+from __future__ import annotations
+
+import functools
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Primes below this bound are stripped off by trial division before any
+# modular exponentiation is spent on a candidate.
+SMALL_PRIME_LIMIT = 1000
+# For n < 2**64 these seven bases make the strong probable prime test exact
+# (Jim Sinclair's set); there are no strong pseudoprimes to all of them.
+DETERMINISTIC_BASES = (2, 325, 9375, 28178, 450775, 9780504, 1795265022)
+# Odd numbers per sieve segment. The segment's bool working set (256 KB)
+# fits in L2, and as a multiple of 8 it packs into whole bytes.
+SEGMENT_ODDS = 1 << 18
+# Base primes at least SEGMENT_ODDS / SPARSE_HITS apart hit a segment at
+# most SPARSE_HITS times; those are marked together with array indexing
+# instead of one slice assignment per prime.
+SPARSE_HITS = 16
+# Odd numbers per Carmichael search segment: one task for a worker process,
+# holding a few int64 arrays of this length.
+KORSELT_SEGMENT = 1 << 20
+# Candidates for `generate_prime` are sieved by the odd primes below this
+# bound (3511 of them) before any of them is given to Miller-Rabin.
+CANDIDATE_SIEVE_LIMIT = 1 << 15
+# Odd candidates sieved at a time. A b-bit prime is about 0.35 b odd
+# numbers away on average, so one window nearly always suffices.
+CANDIDATE_WINDOW = 4096
+# For n < 2**32 the bases 2, 7 and 61 already make Miller-Rabin exact.
+BASES_32 = (2, 7, 61)
+# Values per task when `is_prime_array` spreads a large input over processes.
+PRIME_ARRAY_CHUNK = 1 << 20
+# Random bases used above 2**64. A composite survives a single round with
+# probability at most 1/4, so 40 rounds leave a 2**-80 chance of error.
+DEFAULT_ROUNDS = 40
+
+
+def _small_primes(limit: int) -> List[int]:
+    primes = []
+    for k in range(2, limit):
+        if all(k % p for p in primes if p * p <= k):
+            primes.append(k)
+    return primes
+
+
+SMALL_PRIMES = _small_primes(SMALL_PRIME_LIMIT)
+SMALL_PRIME_SET = frozenset(SMALL_PRIMES)
+# Product of all small primes: one gcd with it trial-divides by every one of
+# them at once, which is much cheaper than a Python loop of `%`.
+SMALL_PRIMORIAL = math.prod(SMALL_PRIMES)
+
+
+def trial_division(n: int) -> Optional[bool]:
+    """Settles primality by the small primes alone when possible.
+
+    Returns True or False when `n` is decided by its small factors (or is
+    small enough that having none proves it prime), and None otherwise.
+    """
+    if n < 2:
+        return False
+    if math.gcd(n, SMALL_PRIMORIAL) != 1:
+        return n in SMALL_PRIME_SET
+    if n < SMALL_PRIME_LIMIT ** 2:
+        return True
+    return None
+
+
+def fermat_is_prime(p: int, base: Optional[int] = None, rng: random.Random = random) -> bool:
+    """Fermat test: whether base**(p - 1) = 1 (mod p).
+
+    Without a `base`, a random one coprime to `p` is drawn. Composites can
+    pass: 2**340 = 1 (mod 341) although 341 = 11 * 31, and Carmichael
+    numbers pass for every coprime base.
+    """
+    if p < 3:
+        return p == 2
+    if base is None:
+        while True:
+            base = rng.randint(2, p - 1)
+            if math.gcd(p, base) == 1:
+                break
+    return pow(base, p - 1, p) == 1
+
+
+def boosted_fermat(p: int, delta: float = 1e-6, rng: random.Random = random) -> bool:
+    """Repeats `fermat_is_prime` until a false positive is less likely than `delta`.
+
+    A composite that fails for at least one coprime base fails for at least
+    half of them, so k random rounds let it through with probability at most
+    2**-k. Carmichael numbers are the exception: they pass every round.
+    """
+    rounds = max(1, math.ceil(math.log2(1 / delta)))
+    return all(fermat_is_prime(p, rng=rng) for _ in range(rounds))
+
+
+def is_strong_probable_prime(n: int, base: int, d: int, s: int) -> bool:
+    """One Miller-Rabin round for odd `n` with `n - 1 == d * 2**s`, `d` odd."""
+    x = pow(base, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def miller_rabin(n: int, rounds: int = DEFAULT_ROUNDS, rng: random.Random = random) -> bool:
+    """Miller-Rabin primality test with a small-prime pre-filter.
+
+    Parameters
+    ----------
+    n : int
+        The number to test.
+    rounds : int
+        How many random bases to try when `n >= 2**64`. Smaller numbers are
+        tested against `DETERMINISTIC_BASES` and the answer is exact.
+    rng : random.Random
+        Source of the random bases. Defaults to the `random` module.
+
+    Returns
+    -------
+    bool
+        Whether `n` is (probably, for `n >= 2**64`) prime.
+    """
+    settled = trial_division(n)
+    return _strong_test(n, rounds, rng)[0] if settled is None else settled
+
+
+def _strong_test(n: int, rounds: int, rng: random.Random) -> Tuple[bool, int]:
+    """Miller-Rabin rounds for an odd `n` that has no small prime factor.
+
+    Returns the verdict and how many modular exponentiations (rounds) it
+    took; a composite usually fails the first one.
+    """
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    if n < 2 ** 64:
+        bases = (a % n for a in DETERMINISTIC_BASES)
+    else:
+        bases = (rng.randint(2, n - 2) for _ in range(rounds))
+    modexps = 0
+    for a in bases:
+        # A base that is a multiple of n (0 mod n) says nothing; skip it.
+        if a == 0:
+            continue
+        modexps += 1
+        if not is_strong_probable_prime(n, a, d, s):
+            return False, modexps
+    return True, modexps
+
+
+def miller_rabin_batch(candidates: Iterable[int], rounds: int = DEFAULT_ROUNDS,
+                       rng: random.Random = random) -> List[bool]:
+    """Runs `miller_rabin` over many candidates.
+
+    All candidates go through the gcd pre-filter first, so the modular
+    exponentiations are only spent on the ones without a small factor.
+    """
+    candidates = list(candidates)
+    verdicts = [trial_division(n) for n in candidates]
+    return [_strong_test(n, rounds, rng)[0] if verdict is None else verdict
+            for n, verdict in zip(candidates, verdicts)]
+
+
+def _odd_sieve(limit: int) -> np.ndarray:
+    """Odd primes up to and including `limit`, by a plain odd-only sieve."""
+    import numpy as np
+    flags = np.ones((limit + 1) // 2, dtype=bool)  # flags[i] stands for 2i + 1
+    flags[:1] = False
+    for i in range(1, (math.isqrt(limit) + 1) // 2):
+        if flags[i]:
+            p = 2 * i + 1
+            flags[p * p // 2::p] = False
+    return 2 * np.flatnonzero(flags) + 1
+
+
+def _odd_segments(start: int, stop: int, size: int = SEGMENT_ODDS) -> Iterator[Tuple[int, np.ndarray]]:
+    """Sieves the odd numbers in [start, stop) one segment at a time.
+
+    Yields ``(first, flags)`` where ``flags[i]`` tells whether ``first + 2i``
+    is prime. Only the base primes up to sqrt(stop) and one segment are in
+    memory at any time.
+    """
+    import numpy as np
+    base = _odd_sieve(math.isqrt(max(stop - 1, 0)))
+    dense = base[base < size // SPARSE_HITS]
+    for first in range(start | 1, stop, 2 * size):
+        m = min(size, (stop - first + 1) // 2)
+        flags = np.ones(m, dtype=bool)
+        # First odd multiple of each base prime inside the segment, but never
+        # below p*p: smaller multiples have a smaller factor too.
+        hits = np.maximum(base * base, -(-first // base) * base)
+        hits += base * (hits % 2 == 0)
+        hits = (hits - first) // 2
+        for p, i in zip(dense.tolist(), hits[:len(dense)].tolist()):
+            flags[i::p] = False
+        sparse, hits = base[len(dense):], hits[len(dense):]
+        for _ in range(SPARSE_HITS):
+            inside = hits < m
+            if not inside.any():
+                break
+            flags[hits[inside]] = False
+            hits = hits + sparse
+        if first == 1:
+            flags[0] = False
+        yield first, flags
+
+
+def iter_primes(start: int, stop: int) -> Iterator[np.ndarray]:
+    """Yields the primes in [start, stop) in increasing order, one segment's
+    worth (an int64 array) at a time, so even ranges up to 1e10 and beyond
+    run in a few MB of memory."""
+    import numpy as np
+    if start <= 2 < stop:
+        yield np.array([2], dtype=np.int64)
+    for first, flags in _odd_segments(max(start, 0), stop):
+        yield first + 2 * np.flatnonzero(flags)
+
+
+def primes_in_range(a: int, b: int) -> np.ndarray:
+    """All primes in [a, b) as one int64 array."""
+    import numpy as np
+    return np.concatenate([np.empty(0, dtype=np.int64), *iter_primes(a, b)])
+
+
+def sieve(n: int) -> np.ndarray:
+    """All primes up to and including `n`, in increasing order."""
+    return primes_in_range(0, n + 1)
+
+
+class PrimeSieve:
+    """Bit-packed table of the primes below `limit`.
+
+    Only odd numbers are stored, one bit each, so the table takes `limit / 16`
+    bytes: 625 MB for 1e10 where a bool array of every number would take
+    10 GB. It is filled segment by segment.
+
+    Examples
+    --------
+    >>> table = PrimeSieve(100)
+    >>> table.is_prime(97), table.is_prime(91)
+    (True, False)
+    >>> table.primes_in_range(10, 30).tolist()
+    [11, 13, 17, 19, 23, 29]
+    """
+
+    def __init__(self, limit: int):
+        """Sieves every number below `limit`."""
+        import numpy as np
+        self.limit = limit
+        odds = max(limit, 0) // 2  # bit i stands for 2i + 1
+        self.bits = np.zeros(-(-odds // 8), dtype=np.uint8)
+        for first, flags in _odd_segments(1, limit):
+            offset = first // 2 // 8
+            packed = np.packbits(flags, bitorder="little")
+            self.bits[offset:offset + len(packed)] = packed
+
+    def is_prime(self, k: int) -> bool:
+        """Whether `k` is prime; `k` must be below the table's limit."""
+        if k >= self.limit:
+            raise ValueError(f"{k} is beyond the sieve limit {self.limit}.")
+        if k < 3 or k % 2 == 0:
+            return k == 2
+        i = k // 2
+        return bool(self.bits[i >> 3] >> (i & 7) & 1)
+
+    def primes_in_range(self, a: int, b: int) -> np.ndarray:
+        """The primes in [a, b) as an int64 array; `b` may not exceed the limit."""
+        import numpy as np
+        if b > self.limit:
+            raise ValueError(f"{b} is beyond the sieve limit {self.limit}.")
+        a = max(a, 0)
+        if a >= b:
+            return np.empty(0, dtype=np.int64)
+        lo, hi = a // 2 // 8, -(-((b + 1) // 2) // 8)
+        odd = 16 * lo + 2 * np.flatnonzero(np.unpackbits(self.bits[lo:hi], bitorder="little")) + 1
+        odd = odd[(odd >= a) & (odd < b)]
+        return np.concatenate(([2], odd)) if a <= 2 < b else odd
+
+    def primes(self) -> np.ndarray:
+        """Every prime in the table."""
+        return self.primes_in_range(0, self.limit)
+
+
+def smallest_prime_factors(limit: int) -> np.ndarray:
+    """Smallest prime factor of every number up to and including `limit`.
+
+    Entry k holds the smallest prime dividing k (k itself for primes, 0 for
+    0 and 1). Filling the table with the primes in decreasing order lets the
+    smallest one win every entry while marking whole slices at a time.
+    """
+    import numpy as np
+    spf = np.zeros(limit + 1, dtype=np.int64)
+    primes = sieve(limit)
+    spf[primes] = primes
+    for p in primes[primes <= math.isqrt(limit)][::-1].tolist():
+        spf[p * p::p] = p
+    return spf
+
+
+def factorize(n: int, spf: np.ndarray) -> List[int]:
+    """Prime factors of `n`, with multiplicity, from a smallest-prime-factor table."""
+    factors = []
+    while n > 1:
+        p = int(spf[n])
+        factors.append(p)
+        n //= p
+    return factors
+
+
+def is_carmichael(n: int, spf: np.ndarray) -> bool:
+    """Korselt's criterion: `n` is a Carmichael number iff it is composite,
+    squarefree and p - 1 divides n - 1 for every prime p dividing it."""
+    factors = factorize(n, spf)
+    return (len(factors) > 1 and len(set(factors)) == len(factors)
+            and all((n - 1) % (p - 1) == 0 for p in factors))
+
+
+def carmichael_numbers(limit: int, workers: Optional[int] = None) -> List[int]:
+    """All Carmichael numbers below `limit`, in increasing order.
+
+    Carmichael numbers are odd, so only odd numbers are examined. The range
+    is cut into segments of `KORSELT_SEGMENT` odd numbers and each segment
+    is factored by sieving with the primes up to sqrt(limit), checking
+    Korselt's criterion as the factors come off. Segments run in parallel
+    on `workers` processes (one per CPU by default; 1 runs them inline).
+    The 646 below 1e9 take about a minute on a single core.
+    """
+    import numpy as np
+    from concurrent.futures import ProcessPoolExecutor
+    base = smallest_prime_factors(math.isqrt(max(limit - 1, 0)))
+    base = np.flatnonzero(base == np.arange(len(base)))
+    base = base[base > 2]
+    tasks = [(first, min(first + 2 * KORSELT_SEGMENT, limit), base)
+             for first in range(3, limit, 2 * KORSELT_SEGMENT)]
+    if workers == 1:
+        segments = map(_carmichael_segment, tasks)
+        return [n for segment in segments for n in segment]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [n for segment in pool.map(_carmichael_segment, tasks) for n in segment]
+
+
+def _carmichael_segment(task: Tuple[int, int, np.ndarray]) -> List[int]:
+    """Carmichael numbers among the odd numbers in [first, stop)."""
+    import numpy as np
+    first, stop, base = task
+    n = np.arange(first, stop, 2, dtype=np.int64)
+    rest = n.copy()  # n with the prime factors found so far divided out
+    korselt = np.ones(len(n), dtype=bool)
+    factors = np.zeros(len(n), dtype=np.int8)
+    for p in base[base * base < stop].tolist():
+        # Index of the first odd multiple of p: first + 2i = 0 (mod p).
+        i = (-first) * ((p + 1) // 2) % p
+        if i >= len(n):
+            continue
+        multiples = slice(i, None, p)
+        quotient = rest[multiples] // p
+        korselt[multiples] &= (quotient % p != 0) & ((n[multiples] - 1) % (p - 1) == 0)
+        rest[multiples] = quotient
+        factors[multiples] += 1
+    # What remains is 1 or a single prime above sqrt(n).
+    large = rest > 1
+    korselt &= ~large | ((n - 1) % np.maximum(rest - 1, 1) == 0)
+    factors += large
+    return n[korselt & (factors > 1)].tolist()
+
+
+@dataclass
+class PrimeSearch:
+    """A generated prime and what it took to find it."""
+    prime: Optional[int]  # None if the search was stopped first
+    tries: int  # odd candidates considered, including the ones sieved out
+    tested: int  # candidates that survived the sieve and went to Miller-Rabin
+    modexps: int  # modular exponentiations spent on those
+    seconds: float
+
+
+def generate_prime(bits: int, rounds: int = DEFAULT_ROUNDS, rng: random.Random = random,
+                   stop: Optional[Callable[[], bool]] = None) -> PrimeSearch:
+    """Finds a random prime in [2**(bits - 1), 2**bits).
+
+    Starting from a random odd number, a window of consecutive odd
+    candidates is sieved against the odd primes below
+    `CANDIDATE_SIEVE_LIMIT` and the survivors are tested in order. The
+    residues of the window start modulo the sieve primes are computed once
+    and then advanced with one array operation per window. About 90% of the
+    candidates never reach Miller-Rabin, so a prime costs roughly a tenth
+    of the modular exponentiations of testing random numbers one by one.
+
+    Parameters
+    ----------
+    bits : int
+        Bit length of the prime, at least 2.
+    rounds : int
+        Miller-Rabin rounds for candidates of 2**64 and above.
+    rng : random.Random
+        Source of the starting points and Miller-Rabin bases.
+    stop : Callable[[], bool], optional
+        Polled before every Miller-Rabin test; once it returns True the
+        search gives up and reports no prime.
+
+    Returns
+    -------
+    PrimeSearch
+        The prime with the number of candidates tried and tested, the
+        modular exponentiations spent and the wall time taken.
+    """
+    import numpy as np
+    started = time.perf_counter()
+    if bits < 2:
+        raise ValueError("A prime has at least 2 bits.")
+    low, high = 2 ** (bits - 1), 2 ** bits
+    # Only primes below every candidate, so that a candidate is never
+    # sieved out for being a multiple of itself.
+    primes = _odd_sieve(min(CANDIDATE_SIEVE_LIMIT, low - 1))
+    # Offsets are counted in odd steps: first + 2i = 0 (mod p) for i = -r / 2.
+    halves = (primes + 1) // 2
+    tries = tested = modexps = 0
+    while True:
+        first = rng.randrange(low, high) | 1
+        residues = np.array([first % p for p in primes.tolist()], dtype=np.int64)
+        while first < high:
+            size = min(CANDIDATE_WINDOW, (high - first + 1) // 2)
+            composite = np.zeros(size, dtype=bool)
+            for p, i in zip(primes.tolist(), (-residues * halves % primes).tolist()):
+                composite[i::p] = True
+            for i in np.flatnonzero(~composite).tolist():
+                if stop is not None and stop():
+                    return PrimeSearch(None, tries + i, tested, modexps, time.perf_counter() - started)
+                tested += 1
+                prime, used = _strong_test(first + 2 * i, rounds, rng)
+                modexps += used
+                if prime:
+                    return PrimeSearch(first + 2 * i, tries + i + 1, tested, modexps,
+                                       time.perf_counter() - started)
+            tries += size
+            first += 2 * size
+            residues = (residues + 2 * size) % primes
+        # Ran off the top of the range without a prime: start somewhere else.
+
+
+@dataclass
+class ParallelPrimeSearch:
+    """The first prime found by `generate_prime_parallel` and every worker's share."""
+    prime: int
+    seconds: float
+    workers: List[PrimeSearch]
+
+    @property
+    def tries(self) -> int:
+        return sum(worker.tries for worker in self.workers)
+
+
+def generate_prime_parallel(bits: int, workers: Optional[int] = None, rounds: int = DEFAULT_ROUNDS,
+                            rng: random.Random = random) -> ParallelPrimeSearch:
+    """Finds a random `bits`-bit prime with independent searches on a process pool.
+
+    Every worker runs `generate_prime` from its own random starting point.
+    As soon as one of them returns a prime a shared event is set, the other
+    searches notice it before their next Miller-Rabin test and stop, and
+    whatever has not started yet is cancelled. With `w` workers the wait for
+    a prime is about 1/w of a single search.
+
+    Parameters
+    ----------
+    bits : int
+        Bit length of the prime, at least 2.
+    workers : int, optional
+        Number of searches and processes; one per CPU by default.
+    rounds : int
+        Miller-Rabin rounds for candidates of 2**64 and above.
+    rng : random.Random
+        Seeds the workers' own generators.
+
+    Returns
+    -------
+    ParallelPrimeSearch
+        The prime, the wall time and one `PrimeSearch` per worker with its
+        tries and elapsed time (and no prime for the workers that stopped).
+    """
+    import multiprocessing
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    workers = workers or multiprocessing.cpu_count()
+    started = time.perf_counter()
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=workers) as pool:
+        found = manager.Event()
+        pending = {pool.submit(_prime_worker, bits, rounds, rng.getrandbits(64), found)
+                   for _ in range(workers)}
+        prime, searches = None, []
+        while prime is None and pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            searches.extend(future.result() for future in done)
+            prime = next((search.prime for search in searches if search.prime is not None), None)
+        found.set()
+        for future in pending:
+            future.cancel()
+        searches.extend(future.result() for future in pending if not future.cancelled())
+    return ParallelPrimeSearch(prime, time.perf_counter() - started, searches)
+
+
+def _prime_worker(bits: int, rounds: int, seed: int, found) -> PrimeSearch:
+    search = generate_prime(bits, rounds, random.Random(seed), stop=found.is_set)
+    if search.prime is not None:
+        found.set()
+    return search
+
+
+def is_prime_array(values, workers: Optional[int] = None) -> np.ndarray:
+    """Exact primality of every element of an integer array.
+
+    Elements are first trial-divided by the primes below
+    `SMALL_PRIME_LIMIT`. The survivors run Miller-Rabin with the
+    deterministic bases, all elements in lockstep as array operations:
+
+    * below 2**32 with bases 2, 7 and 61, where a product of two residues
+      fits in uint64 and `a * b % m` is exact;
+    * below 2**62 with `DETERMINISTIC_BASES`, multiplying with the long
+      double quotient estimate (`_mulmod_long_double`);
+    * above that on object arrays of Python ints, which is exact but slow.
+
+    Inputs longer than `PRIME_ARRAY_CHUNK` are split into chunks that run
+    on `workers` processes (one per CPU by default; 1 runs them inline).
+
+    Parameters
+    ----------
+    values : array_like of int
+        Values below 2**63; negative values are not prime.
+    workers : int, optional
+        Number of worker processes for large inputs.
+
+    Returns
+    -------
+    np.ndarray
+        A bool array with the shape of `values`.
+    """
+    import numpy as np
+    values = np.asarray(values)
+    flat = values.ravel()
+    if flat.size > PRIME_ARRAY_CHUNK and workers != 1:
+        from concurrent.futures import ProcessPoolExecutor
+        chunks = [flat[i:i + PRIME_ARRAY_CHUNK] for i in range(0, flat.size, PRIME_ARRAY_CHUNK)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            flags = np.concatenate(list(pool.map(_is_prime_chunk, chunks)))
+    else:
+        flags = _is_prime_chunk(flat)
+    return flags.reshape(values.shape)
+
+
+def _is_prime_chunk(values: np.ndarray) -> np.ndarray:
+    import numpy as np
+    if values.dtype.kind not in "iu":
+        raise TypeError("is_prime_array needs an integer array.")
+    flags = np.zeros(values.shape, dtype=bool)
+    candidates = np.flatnonzero(values >= 2)
+    n = values[candidates].astype(np.uint64)
+
+    small = np.array(SMALL_PRIMES, dtype=np.uint64)
+    flags[candidates[np.isin(n, small)]] = True
+    rough = np.ones(n.shape, dtype=bool)
+    for p in small:
+        rough &= n % p != 0
+    candidates, n = candidates[rough], n[rough]
+    # Without a factor below SMALL_PRIME_LIMIT, anything below its square is prime.
+    proven = n < SMALL_PRIME_LIMIT ** 2
+    flags[candidates[proven]] = True
+    candidates, n = candidates[~proven], n[~proven]
+
+    tiers = [(n < 2 ** 32, BASES_32, _mulmod_uint64)]
+    if _long_double_mulmod():
+        tiers.append(((n >= 2 ** 32) & (n < 2 ** 62), DETERMINISTIC_BASES, _mulmod_long_double))
+        tiers.append((n >= 2 ** 62, DETERMINISTIC_BASES, _mulmod_object))
+    else:
+        tiers.append((n >= 2 ** 32, DETERMINISTIC_BASES, _mulmod_object))
+    for selected, bases, mulmod in tiers:
+        tier = n[selected]
+        if mulmod is _mulmod_object:
+            tier = tier.astype(object)
+        flags[candidates[selected]] = _strong_probable_primes(tier, bases, mulmod)
+    return flags
+
+
+def _strong_probable_primes(n: np.ndarray, bases: Tuple[int, ...], mulmod) -> np.ndarray:
+    """Miller-Rabin over an array of odd `n` for all `bases`, elementwise."""
+    import numpy as np
+    d, s = n - 1, np.zeros(n.shape, dtype=np.int64)
+    even = d % 2 == 0
+    while even.any():
+        d = np.where(even, d // 2, d)
+        s += even
+        even = d % 2 == 0
+    passed = np.ones(n.shape, dtype=bool)
+    for a in bases:
+        # Only the elements that passed every earlier base are still tested.
+        live = np.flatnonzero(passed)
+        if not live.size:
+            break
+        m, e, k = n[live], d[live], s[live]
+        x = _powmod(m, e, m, a, mulmod)
+        ok = (x == 1) | (x == m - 1)
+        for r in range(1, int(k.max())):
+            squaring = ~ok & (r < k)
+            if not squaring.any():
+                break
+            x = mulmod(x, x, m)
+            ok |= squaring & (x == m - 1)
+        passed[live] = ok
+    return passed
+
+
+def _powmod(n: np.ndarray, e: np.ndarray, m: np.ndarray, base: int, mulmod) -> np.ndarray:
+    """base**e mod m elementwise, by square-and-multiply over the exponent bits."""
+    import numpy as np
+    result = np.ones_like(n)
+    power = np.full_like(n, base) % m
+    e = e.copy()
+    while (e > 0).any():
+        odd = e % 2 == 1
+        result = np.where(odd, mulmod(result, power, m), result)
+        power = mulmod(power, power, m)
+        e //= 2
+    return result
+
+
+def _mulmod_uint64(a: np.ndarray, b: np.ndarray, m: np.ndarray) -> np.ndarray:
+    """a * b mod m for m < 2**32, where the product cannot wrap."""
+    return a * b % m
+
+
+@functools.lru_cache(maxsize=None)
+def _long_double_mulmod() -> bool:
+    """Whether `_mulmod_long_double` is exact on this platform.
+
+    x87 extended precision keeps a 64-bit mantissa, enough to estimate
+    floor(a * b / m) to within one for a, b < m < 2**62. Where long double is
+    just a double (MSVC, AArch64) the 62-bit path falls back to Python ints.
+    """
+    import numpy as np
+    return np.finfo(np.longdouble).nmant >= 63
+
+
+def _mulmod_long_double(a: np.ndarray, b: np.ndarray, m: np.ndarray) -> np.ndarray:
+    """a * b mod m for a, b < m < 2**62 without 128-bit integers.
+
+    The quotient q = floor(a * b / m) is estimated in long double, which is
+    off by at most one. The remainder a * b - q * m is then computed with
+    wrapping uint64 arithmetic: its true value lies in (-m, 2m), which int64
+    represents exactly, so one correction step in each direction fixes it.
+    """
+    import numpy as np
+    q = (a.astype(np.longdouble) * b.astype(np.longdouble) / m.astype(np.longdouble)).astype(np.uint64)
+    r = (a * b - q * m).view(np.int64)
+    mi = m.view(np.int64)
+    r = np.where(r < 0, r + mi, r)
+    r = np.where(r >= mi, r - mi, r)
+    return r.view(np.uint64)
+
+
+def _mulmod_object(a: np.ndarray, b: np.ndarray, m: np.ndarray) -> np.ndarray:
+    """a * b mod m on object arrays, with Python's arbitrary-precision ints."""
+    return a * b % m
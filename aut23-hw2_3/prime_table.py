@@ -0,0 +1,167 @@
+"""Persistent prime table shared between processes through a memory map.
+
+The table is built once with the segmented sieve from `primality` and saved
+as a bitmap of the odd numbers below its limit (one bit each, like
+`primality.PrimeSieve`), preceded by the number of primes before every block
+of `BLOCK_BYTES` bitmap bytes. Opening the file maps it read-only, so any
+number of processes share the same pages instead of each re-sieving and
+holding its own copy::
+
+    python3 prime_table.py build primes.bin 1000000000
+    python3 prime_table.py query primes.bin --count 1000000 --nth 1000
+"""
+import argparse
+import struct
+import sys
+from typing import List
+
+import numpy as np
+
+from primality import _odd_segments
+
+MAGIC = b"PRIMETAB"
+# Magic, limit, block size in bytes and number of blocks.
+HEADER = struct.Struct("<8sQQQ")
+# Bitmap bytes per block. Each block covers 2048 odd numbers (4096 integers)
+# and stores one 8-byte count, so the counts add 1/32 to the file and a query
+# counts the bits of at most one block.
+BLOCK_BYTES = 256
+# Number of set bits in every byte value.
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def build_prime_table(path: str, limit: int) -> "PrimeTable":
+    """Sieves every number below `limit` and writes the table to `path`.
+
+    Segments are written straight into the memory-mapped file, so building
+    needs only the sieve's own few MB of memory whatever the limit.
+    """
+    odds = limit // 2  # bit i stands for 2i + 1
+    blocks = -(-odds // (8 * BLOCK_BYTES))
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, limit, BLOCK_BYTES, blocks))
+        f.truncate(HEADER.size + 8 * (blocks + 1) + blocks * BLOCK_BYTES)
+
+    counts = np.memmap(path, dtype=np.uint64, mode="r+", offset=HEADER.size, shape=(blocks + 1,))
+    bits = np.memmap(path, dtype=np.uint8, mode="r+", offset=HEADER.size + counts.nbytes,
+                     shape=(blocks * BLOCK_BYTES,))
+    # Segments hold a whole number of blocks, so each block is counted from
+    # the flags of the segment it lies in.
+    for first, flags in _odd_segments(1, limit):
+        offset = first // 2 // 8
+        packed = np.packbits(flags, bitorder="little")
+        bits[offset:offset + len(packed)] = packed
+        block = offset // BLOCK_BYTES
+        per_block = np.add.reduceat(flags, np.arange(0, len(flags), 8 * BLOCK_BYTES), dtype=np.uint64)
+        counts[1 + block:1 + block + len(per_block)] = per_block
+    counts[0] = 0
+    np.cumsum(counts, out=counts)
+    counts.flush()
+    bits.flush()
+    del counts, bits
+    return PrimeTable(path)
+
+
+class PrimeTable:
+    """Read-only view of a table written by `build_prime_table`.
+
+    `is_prime` is one bit lookup, `prime_count` adds a stored block count to
+    the bits set in part of one block, and `nth_prime` binary searches the
+    block counts. Pickling a table only pickles its path, so worker
+    processes map the same file rather than receiving a copy.
+
+    Examples
+    --------
+    >>> table = PrimeTable("primes.bin")  # doctest: +SKIP
+    >>> table.prime_count(100), table.nth_prime(25)  # doctest: +SKIP
+    (25, 97)
+    """
+
+    def __init__(self, path: str):
+        """Maps the table stored at `path`."""
+        self.path = path
+        with open(path, "rb") as f:
+            magic, self.limit, self.block_bytes, blocks = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a prime table.")
+        self.counts = np.memmap(path, dtype=np.uint64, mode="r", offset=HEADER.size, shape=(blocks + 1,))
+        self.bits = np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER.size + self.counts.nbytes,
+                              shape=(blocks * self.block_bytes,))
+
+    def __reduce__(self):
+        return PrimeTable, (self.path,)
+
+    def __len__(self) -> int:
+        """Number of primes in the table."""
+        return self.prime_count(self.limit - 1)
+
+    def is_prime(self, k: int) -> bool:
+        """Whether `k` is prime; `k` must be below the table's limit."""
+        self._check(k)
+        if k < 3 or k % 2 == 0:
+            return k == 2
+        i = k // 2
+        return bool(self.bits[i >> 3] >> (i & 7) & 1)
+
+    def prime_count(self, x: int) -> int:
+        """pi(x), the number of primes up to and including `x`."""
+        if x < 2:
+            return 0
+        self._check(x)
+        i = (x - 1) // 2  # bit of the largest odd number <= x
+        block, byte = divmod(i >> 3, self.block_bytes)
+        start = block * self.block_bytes
+        whole = int(POPCOUNT[self.bits[start:start + byte]].sum())
+        partial = bin(int(self.bits[start + byte]) & ((2 << (i & 7)) - 1)).count("1")
+        return 1 + int(self.counts[block]) + whole + partial
+
+    def nth_prime(self, k: int) -> int:
+        """The `k`-th prime, counting 2 as the first."""
+        if k < 1:
+            raise ValueError("Primes are counted from 1.")
+        if k == 1:
+            self._check(2)
+            return 2
+        # Looking for the (k - 1)-th odd prime: find the block it falls in.
+        block = int(np.searchsorted(self.counts, k - 1, side="left")) - 1
+        if block + 1 >= len(self.counts):
+            raise ValueError(f"The table only holds {len(self)} primes.")
+        start = block * self.block_bytes
+        bits = np.unpackbits(self.bits[start:start + self.block_bytes], bitorder="little")
+        i = np.flatnonzero(bits)[k - 2 - int(self.counts[block])]
+        return 2 * (8 * start + int(i)) + 1
+
+    def _check(self, k: int):
+        if k >= self.limit:
+            raise ValueError(f"{k} is beyond the table limit {self.limit}.")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="sieve the numbers below LIMIT into a table file")
+    build.add_argument("path")
+    build.add_argument("limit", type=int)
+    query = commands.add_parser("query", help="answer queries from a table file")
+    query.add_argument("path")
+    query.add_argument("--is-prime", type=int, nargs="*", default=[])
+    query.add_argument("--count", type=int, nargs="*", default=[], help="pi(x) for each x")
+    query.add_argument("--nth", type=int, nargs="*", default=[], help="the k-th prime for each k")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        table = build_prime_table(args.path, args.limit)
+        print(f"{len(table)} primes below {table.limit}")
+        return 0
+    table = PrimeTable(args.path)
+    for k in args.is_prime:
+        print(f"is_prime({k}) = {table.is_prime(k)}")
+    for x in args.count:
+        print(f"pi({x}) = {table.prime_count(x)}")
+    for k in args.nth:
+        print(f"prime #{k} = {table.nth_prime(k)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+
+import pytest
+
+import bench_primes
+from bench_primes import Sample, fit_exponent, run, summarize, write_csv, write_json
+
+SAMPLES = [Sample(64, 0, 10, 2, 20, 1000), Sample(64, 1, 30, 4, 40, 3000), Sample(128, 0, 50, 6, 60, 8000)]
+
+
+@pytest.mark.parametrize("k,c", [(3.58, 2e-9), (1.0, 0.5), (-0.5, 7.0)])
+def test_fit_exponent(k, c):
+    summary = {bits: {"seconds_mean": c * bits ** k} for bits in (64, 128, 256, 1024)}
+
+    fitted_k, fitted_c = fit_exponent(summary)
+
+    assert fitted_k == pytest.approx(k)
+    assert fitted_c == pytest.approx(c)
+
+
+@pytest.mark.parametrize("summary", [
+    {},
+    {64: {"seconds_mean": 1.0}},
+    {64: {"seconds_mean": 1.0}, 128: {"seconds_mean": 0.0}},  # a zero mean has no logarithm
+])
+def test_fit_exponent_needs_two_points(summary):
+    with pytest.raises(ValueError):
+        fit_exponent(summary)
+
+
+def test_summarize():
+    summary = summarize(SAMPLES)
+
+    assert list(summary) == [64, 128]
+    assert summary[64]["trials"] == 2
+    assert summary[64]["tries_mean"] == 20 and summary[64]["tries_std"] == 10
+    assert summary[64]["seconds_mean"] == pytest.approx(2e-6)
+    assert summary[128]["modexps_std"] == 0
+
+
+def test_write_csv():
+    file = io.StringIO()
+    write_csv(SAMPLES, file)
+    file.seek(0)
+
+    rows = list(csv.DictReader(file))
+
+    assert [Sample(**{name: int(value) for name, value in row.items()}) for row in rows] == SAMPLES
+
+
+def test_write_json():
+    file = io.StringIO()
+    write_json(SAMPLES, file)
+
+    written = json.loads(file.getvalue())
+
+    assert [Sample(**sample) for sample in written["samples"]] == SAMPLES
+    assert written["summary"]["64"] == summarize(SAMPLES)[64]
+    assert written["fit"]["predicted_exponent"] == bench_primes.PREDICTED_EXPONENT
+    assert written["fit"]["exponent"] == pytest.approx(fit_exponent(summarize(SAMPLES))[0])
+
+
+def test_write_json_one_bit_length():
+    file = io.StringIO()
+    write_json(SAMPLES[:2], file)
+
+    assert json.loads(file.getvalue())["fit"]["exponent"] is None
+
+
+def test_run():
+    samples = run([16, 32], trials=3, workers=1, seed=1)
+
+    assert [(s.bits, s.trial) for s in samples] == [(16, 0), (16, 1), (16, 2), (32, 0), (32, 1), (32, 2)]
+    assert all(s.nanoseconds > 0 and 1 <= s.tested <= s.tries for s in samples)
+    # Bit lengths are seeded on their own, so the process pool samples the same primes.
+    pooled = run([16, 32], trials=3, workers=2, seed=1)
+    assert [s.tries for s in pooled] == [s.tries for s in samples]
+
+
+def test_main(tmp_path, capsys):
+    json_path, csv_path = tmp_path / "primes.json", tmp_path / "primes.csv"
+
+    assert bench_primes.main(["--min-bits", "16", "--max-bits", "48", "--step", "16", "--trials", "2",
+                              "--workers", "1", "--json", str(json_path), "--csv", str(csv_path)]) == 0
+
+    assert "predicted exponent" in capsys.readouterr().out
+    assert len(json.loads(json_path.read_text())["samples"]) == 6
+    assert len(csv_path.read_text().splitlines()) == 7
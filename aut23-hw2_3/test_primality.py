@@ -0,0 +1,282 @@
+import random
+
+import numpy as np
+import pytest
+
+import primality
+from primality import (PrimeSieve, _odd_segments, carmichael_numbers, factorize, generate_prime,
+                       generate_prime_parallel, is_carmichael, is_prime_array, iter_primes, miller_rabin,
+                       miller_rabin_batch, primes_in_range, sieve, smallest_prime_factors)
+
+# Strong pseudoprimes without a factor below SMALL_PRIME_LIMIT, so they reach
+# the Miller-Rabin tiers: to bases 2, 3 and 5; to bases 2, 7 and 61 (the
+# 32-bit bases, just above 2**32); to every prime base up to 37.
+STRONG_PSEUDOPRIMES = [25326001, 4759123141, 3825123056546413051]
+
+
+def around(n, width=50):
+    return list(range(n - width, n + width))
+
+
+def naive_primes(a, b):
+    return [n for n in range(max(a, 2), b) if all(n % p for p in range(2, int(n ** 0.5) + 1))]
+
+
+def test_miller_rabin_small():
+    expected = set(naive_primes(0, 20000))
+
+    assert [n for n in range(-10, 20000) if miller_rabin(n)] == sorted(expected)
+
+
+@pytest.mark.parametrize("n", STRONG_PSEUDOPRIMES + [561, 41041, 825265, 2 ** 64 - 1, (2 ** 31 - 1) ** 2,
+                               4294967297])
+def test_miller_rabin_composites(n):
+    # Carmichael numbers, strong pseudoprimes, a prime square, and 2**32 + 1 = 641 * 6700417.
+    assert not miller_rabin(n)
+    assert not miller_rabin(n, rounds=1, rng=random.Random(0))
+
+
+@pytest.mark.parametrize("n", [2 ** 31 - 1, 2 ** 61 - 1, 2 ** 64 - 59, 2 ** 89 - 1, 2 ** 127 - 1, 2 ** 521 - 1])
+def test_miller_rabin_primes(n):
+    assert miller_rabin(n)
+
+
+def test_miller_rabin_large_composites():
+    # A product of two large primes has no small factor for trial division to find.
+    assert not miller_rabin((2 ** 61 - 1) * (2 ** 89 - 1))
+    assert not miller_rabin((2 ** 127 - 1) ** 2)
+
+
+def test_miller_rabin_batch():
+    rng = random.Random(1)
+    candidates = [rng.randrange(2 ** bits) for bits in (8, 20, 40, 64, 100) for _ in range(200)]
+    candidates += STRONG_PSEUDOPRIMES + [0, 1, 2, 2 ** 89 - 1]
+
+    assert miller_rabin_batch(candidates, rng=random.Random(2)) == [miller_rabin(n) for n in candidates]
+    assert miller_rabin_batch(iter(candidates[:50])) == [miller_rabin(n) for n in candidates[:50]]
+    assert miller_rabin_batch([]) == []
+
+
+@pytest.mark.parametrize("n,expected", [(0, []), (1, []), (2, [2]), (3, [2, 3]), (4, [2, 3])])
+def test_sieve_small_limits(n, expected):
+    primes = sieve(n)
+
+    assert primes.dtype == np.int64
+    assert primes.tolist() == expected
+
+
+@pytest.mark.parametrize("start,stop,size", [(0, 1000, 8), (1, 1000, 7), (2, 1000, 16), (3, 999, 5),
+                                             (500, 2000, 16), (501, 2001, 3), (10 ** 6, 10 ** 6 + 3000, 64)])
+def test_odd_segments(start, stop, size):
+    segments = list(_odd_segments(start, stop, size))
+    odds = [first + 2 * i for first, flags in segments for i in range(len(flags))]
+    primes = [first + 2 * i for first, flags in segments for i in np.flatnonzero(flags).tolist()]
+
+    # Segments tile the odd numbers of [start, stop) without gaps or overlaps.
+    assert odds == list(range(start | 1, stop, 2))
+    assert all(len(flags) <= size for _, flags in segments)
+    assert primes == [p for p in naive_primes(start, stop) if p != 2]
+
+
+def test_odd_segments_sparse_primes(monkeypatch):
+    # With one hit per segment, every base prime goes through the fancy-index path.
+    monkeypatch.setattr(primality, "SPARSE_HITS", 1)
+    start, stop = 10 ** 8, 10 ** 8 + 20000
+
+    segments = _odd_segments(start, stop, 1000)
+    primes = np.concatenate([first + 2 * np.flatnonzero(flags) for first, flags in segments])
+
+    assert primes.tolist() == naive_primes(start, stop)
+
+
+@pytest.mark.parametrize("start,stop", [(0, 100), (2, 3), (3, 3), (-5, 30), (89, 98), (97, 98),
+                                        (10 ** 9, 10 ** 9 + 500)])
+def test_primes_in_range(start, stop):
+    assert primes_in_range(start, stop).tolist() == naive_primes(start, stop)
+
+
+@pytest.mark.parametrize("start,stop", [(0, 3 * primality.SEGMENT_ODDS),
+                                        (primality.SEGMENT_ODDS + 1, 5 * primality.SEGMENT_ODDS)])
+def test_iter_primes_spans_segments(start, stop):
+    chunks = list(iter_primes(start, stop))
+    numbers = np.arange(start, stop)
+
+    assert len(chunks) > 1
+    assert all(chunk.dtype == np.int64 and chunk.size for chunk in chunks)
+    assert np.concatenate(chunks).tolist() == numbers[is_prime_array(numbers)].tolist()
+
+
+def test_sieve_counts():
+    assert [len(sieve(10 ** k)) for k in range(1, 8)] == [4, 25, 168, 1229, 9592, 78498, 664579]
+
+
+@pytest.mark.parametrize("limit", [0, 1, 2, 3, 4, 17, 100, 1000, 4099])
+def test_prime_sieve(limit):
+    table = PrimeSieve(limit)
+    expected = naive_primes(0, limit)
+
+    assert table.primes().tolist() == expected
+    assert [k for k in range(limit) if table.is_prime(k)] == expected
+    for a, b in [(0, limit), (2, limit), (limit // 3, limit // 2), (limit // 2 + 1, limit)]:
+        assert table.primes_in_range(a, b).tolist() == naive_primes(a, b)
+
+
+def test_prime_sieve_limit():
+    table = PrimeSieve(100)
+
+    with pytest.raises(ValueError):
+        table.is_prime(100)
+    with pytest.raises(ValueError):
+        table.primes_in_range(0, 101)
+
+
+def test_smallest_prime_factors():
+    spf = smallest_prime_factors(5000)
+
+    assert spf[:2].tolist() == [0, 0]
+    assert all(spf[k] == min(p for p in range(2, k + 1) if k % p == 0) for k in range(2, 5001))
+    assert factorize(4620, spf) == [2, 2, 3, 5, 7, 11]
+    assert factorize(4999, spf) == [4999]
+
+
+@pytest.mark.parametrize("limit,expected", [(0, []), (561, []), (562, [561]),
+                                            (3000, [561, 1105, 1729, 2465, 2821])])
+def test_carmichael_numbers_small(limit, expected):
+    assert carmichael_numbers(limit, workers=1) == expected
+
+
+@pytest.mark.parametrize("limit,count", [(10 ** 6, 43), (10 ** 7, 105)])
+def test_carmichael_numbers_count(limit, count):
+    numbers = carmichael_numbers(limit)
+
+    assert len(numbers) == count
+    assert numbers == sorted(numbers) and numbers[-1] < limit
+
+
+def test_carmichael_numbers_korselt(monkeypatch):
+    # Short segments, so numbers land on both sides of many segment edges.
+    monkeypatch.setattr(primality, "KORSELT_SEGMENT", 1000)
+    spf = smallest_prime_factors(200000)
+
+    assert carmichael_numbers(200000, workers=1) == [n for n in range(200000) if n > 1 and is_carmichael(n, spf)]
+
+
+@pytest.mark.parametrize("bits", [2, 3, 4, 5, 8, 16, 31, 32, 33, 64, 65, 128, 512])
+def test_generate_prime_bits(bits):
+    search = generate_prime(bits, rng=random.Random(bits))
+
+    assert search.prime.bit_length() == bits
+    assert miller_rabin(search.prime)
+    assert 1 <= search.tested <= search.tries
+    assert search.modexps >= search.tested
+    assert search.seconds >= 0
+
+
+@pytest.mark.parametrize("bits", [6, 7, 9])
+def test_generate_prime_reaches_every_prime(bits):
+    # Candidates near the top of the range run off it and restart; small
+    # primes must never be sieved out as multiples of themselves.
+    found = {generate_prime(bits, rng=random.Random(seed)).prime for seed in range(3000)}
+
+    assert found == set(naive_primes(2 ** (bits - 1), 2 ** bits))
+
+
+def test_generate_prime_seeded():
+    assert generate_prime(100, rng=random.Random(5)).prime == generate_prime(100, rng=random.Random(5)).prime
+
+
+def test_generate_prime_stop():
+    search = generate_prime(512, rng=random.Random(0), stop=lambda: True)
+
+    assert search.prime is None
+    assert search.tested == search.modexps == 0
+    assert search.tries >= 0
+
+
+def test_generate_prime_stop_later():
+    polls = []
+
+    def stop():
+        polls.append(None)
+        return len(polls) > 3
+
+    search = generate_prime(2048, rng=random.Random(0), stop=stop)
+
+    # Polled before every Miller-Rabin test: three composites ran, the fourth poll stopped it.
+    assert search.prime is None
+    assert search.tested == 3 and len(polls) == 4
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_generate_prime_parallel(workers):
+    search = generate_prime_parallel(128, workers=workers, rng=random.Random(workers))
+
+    assert search.prime.bit_length() == 128 and miller_rabin(search.prime)
+    assert 1 <= len(search.workers) <= workers
+    assert sum(worker.prime is not None for worker in search.workers) >= 1
+    assert search.prime in [worker.prime for worker in search.workers]
+    assert search.tries == sum(worker.tries for worker in search.workers)
+
+
+def test_generate_prime_rejects_one_bit():
+    with pytest.raises(ValueError):
+        generate_prime(1)
+
+
+@pytest.mark.parametrize("values", [
+    around(2 ** 32),
+    around(2 ** 62),
+    around(10 ** 6),  # SMALL_PRIME_LIMIT ** 2, below which trial division decides
+    list(range(-20, 1200)),
+    STRONG_PSEUDOPRIMES,
+])
+def test_is_prime_array_int64(values):
+    flags = is_prime_array(np.array(values, dtype=np.int64))
+
+    assert flags.dtype == bool
+    assert flags.tolist() == [miller_rabin(n) for n in values]
+
+
+def test_is_prime_array_uint64_above_2_63():
+    values = around(2 ** 63) + around(2 ** 64 - 50, 49) + STRONG_PSEUDOPRIMES
+
+    flags = is_prime_array(np.array(values, dtype=np.uint64))
+
+    assert flags.tolist() == [miller_rabin(n) for n in values]
+    assert flags[values.index(2 ** 64 - 59)]
+
+
+def test_is_prime_array_random():
+    rng = random.Random(0)
+    values = [rng.randrange(2 ** bits) | 1 for bits in range(2, 63) for _ in range(30)]
+
+    assert is_prime_array(values).tolist() == [miller_rabin(n) for n in values]
+
+
+def test_is_prime_array_small_and_negative():
+    assert is_prime_array([-7, -2, -1, 0, 1, 2, 3, 4]).tolist() == [False] * 5 + [True, True, False]
+
+
+@pytest.mark.parametrize("shape", [(0,), (3, 0), (4, 5), (2, 3, 2)])
+def test_is_prime_array_shapes(shape):
+    values = np.arange(np.prod(shape), dtype=np.int64).reshape(shape) * 7919 + 101
+
+    flags = is_prime_array(values)
+
+    assert flags.shape == shape
+    assert flags.ravel().tolist() == [miller_rabin(int(n)) for n in values.ravel()]
+
+
+def test_is_prime_array_rejects_floats():
+    with pytest.raises(TypeError):
+        is_prime_array([2.0, 3.0])
+
+
+def test_is_prime_array_process_pool(monkeypatch):
+    monkeypatch.setattr(primality, "PRIME_ARRAY_CHUNK", 100)
+    values = np.array(around(2 ** 32, 150) + around(2 ** 62, 150), dtype=np.int64)
+
+    flags = is_prime_array(values, workers=2)
+
+    assert flags.tolist() == is_prime_array(values, workers=1).tolist()
+    assert flags.tolist() == [miller_rabin(int(n)) for n in values]
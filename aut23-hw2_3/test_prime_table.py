@@ -0,0 +1,102 @@
+import pickle
+
+import numpy as np
+import pytest
+
+import zhiwei_hw2_primality_testing
+from primality import SEGMENT_ODDS, sieve
+from prime_table import HEADER, PrimeTable, build_prime_table, main
+
+
+@pytest.fixture(scope="module")
+def tables(tmp_path_factory):
+    built = {}
+
+    def table(limit):
+        if limit not in built:
+            built[limit] = build_prime_table(str(tmp_path_factory.mktemp("tables") / f"{limit}.bin"), limit)
+        return built[limit]
+    return table
+
+
+# Limits around the ends of the first two blocks (2048 odd numbers, so 4096
+# integers, each) and spanning several sieve segments (2 * SEGMENT_ODDS
+# integers each).
+@pytest.mark.parametrize("limit", [3, 4, 5, 100, 4097, 8192, 8193, 8195, 5 * SEGMENT_ODDS + 7])
+def test_matches_sieve(tables, limit):
+    table = tables(limit)
+    primes = sieve(limit - 1)
+
+    assert table.limit == limit
+    assert len(table) == len(primes)
+    flags = np.zeros(limit, dtype=bool)
+    flags[primes] = True
+    numbers = list(range(limit))
+    if limit > 10 ** 4:
+        # The ends of the table and both sides of every segment edge.
+        edges = range(2 * SEGMENT_ODDS, limit, 2 * SEGMENT_ODDS)
+        around_edges = [k for edge in edges for k in range(edge - 500, edge + 500)]
+        numbers = sorted(set(numbers[:5000] + numbers[-5000:] + around_edges))
+    assert [table.is_prime(k) for k in numbers] == flags[numbers].tolist()
+    assert [table.prime_count(x) for x in numbers] == np.cumsum(flags)[numbers].tolist()
+    ks = np.unique(np.r_[1:1000, len(primes) - 1000:len(primes) + 1].clip(1, len(primes)))
+    assert [table.nth_prime(int(k)) for k in ks] == primes[ks - 1].tolist()
+
+
+def test_past_the_end(tables):
+    table = tables(100)
+
+    assert table.nth_prime(25) == 97
+    with pytest.raises(ValueError):
+        table.nth_prime(26)
+    with pytest.raises(ValueError):
+        table.nth_prime(0)
+    with pytest.raises(ValueError):
+        table.is_prime(100)
+    with pytest.raises(ValueError):
+        table.prime_count(100)
+    assert tables(2).prime_count(1) == 0
+    with pytest.raises(ValueError):
+        tables(2).nth_prime(1)
+
+
+def test_pickle(tables):
+    table = tables(8193)
+
+    restored = pickle.loads(pickle.dumps(table))
+
+    assert restored.path == table.path and restored.limit == table.limit
+    assert isinstance(restored.bits, np.memmap)
+    assert restored.nth_prime(1000) == table.nth_prime(1000) == 7919
+    # Only the path is pickled, not the bitmap.
+    assert len(pickle.dumps(table)) < 200
+
+
+def test_bad_magic(tmp_path):
+    path = tmp_path / "primes.bin"
+    path.write_bytes(HEADER.pack(b"NOTPRIME", 100, 256, 1) + bytes(8 * 2 + 256))
+
+    with pytest.raises(ValueError, match="not a prime table"):
+        PrimeTable(str(path))
+
+
+def test_main(tmp_path, capsys):
+    path = str(tmp_path / "primes.bin")
+
+    assert main(["build", path, "1000"]) == 0
+    assert main(["query", path, "--is-prime", "997", "--count", "100", "--nth", "168"]) == 0
+
+    assert capsys.readouterr().out.splitlines() == [
+        "168 primes below 1000", "is_prime(997) = True", "pi(100) = 25", "prime #168 = 997"]
+
+
+def test_cli_rebuilds_short_table(tmp_path, capsys):
+    path = str(tmp_path / "primes.bin")
+    build_prime_table(path, 100)
+
+    for n in (1000, 100, 99):
+        zhiwei_hw2_primality_testing.main(["sieve", "--n", str(n), "--table", path])
+
+    # Reaching N = 1000 needed a bigger table; N = 100 and 99 fit in it.
+    assert capsys.readouterr().out.splitlines() == ["168", "25", "25"]
+    assert PrimeTable(path).limit == 1001
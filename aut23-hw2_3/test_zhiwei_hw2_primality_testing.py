@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+from primality import miller_rabin
+from zhiwei_hw2_primality_testing import main
+
+
+def test_import_has_no_side_effects():
+    # The experiments only run as subcommands; importing pulls in neither
+    # NumPy nor matplotlib and prints nothing.
+    code = ("import sys, primality, zhiwei_hw2_primality_testing; "
+            "print(sorted({'numpy', 'matplotlib'} & set(sys.modules)))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            timeout=60)
+
+    assert result.stdout == "[]\n"
+    assert result.stderr == ""
+
+
+def test_sieve(capsys):
+    assert main(["sieve", "--n", "100"]) == 0
+
+    assert capsys.readouterr().out == "25\n"
+
+
+def test_carmichael(capsys):
+    assert main(["carmichael", "--limit", "3000"]) == 0
+
+    # The Carmichael numbers, boosted Fermat accepting all of them and
+    # Miller-Rabin accepting none.
+    assert capsys.readouterr().out.splitlines() == ["[561, 1105, 1729, 2465, 2821]", "True", "[]"]
+
+
+def test_generate(capsys):
+    assert main(["generate", "--bits", "64", "--workers", "1"]) == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("After ") and lines[0].endswith("generated the following prime")
+    assert int(lines[1]).bit_length() == 64 and miller_rabin(int(lines[1]))
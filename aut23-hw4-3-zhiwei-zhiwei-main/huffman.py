@@ -8,6 +8,10 @@ from heapq import heappush, heappop
 
 from bitstring import Bits
 
+# Width in bits of the primary decoding table, which has 2**LOOKUP_BITS
+# entries. At most 17, so that a window always fits in three bytes.
+LOOKUP_BITS = 12
+
 
 class HuffmanCodec:
     # """Codec (encoder/decoder) for a specific Huffman code.
@@ -55,6 +59,88 @@ class HuffmanCodec:
         """
         self.root = HuffmanCodec._build_tree(frequency_map=frequency_map)
         self.code = self._get_code()
+        # The canonical code keeps only the tree's depths, so rebuild the tree
+        # from the code words for `root` to agree with `code`.
+        self.root = HuffmanCodec._tree_from_code(self.code)
+        self._prepare_decoding()
+
+    @classmethod
+    def from_bytes(cls, header: bytes) -> HuffmanCodec:
+        """Rebuilds a codec from the header written by `to_bytes`.
+
+        Parameters
+        ----------
+        header : bytes
+            Serialized code lengths.
+
+        Returns
+        -------
+        HuffmanCodec
+            Codec with the same code words as the serialized one.
+
+        Raises
+        ------
+        ValueError
+            If header is not a valid serialized codec.
+        """
+        try:
+            max_length, position = _read_varint(header, 0)
+            counts = []
+            for _ in range(max_length + 1):
+                count, position = _read_varint(header, position)
+                counts.append(count)
+            symbols = header[position:].decode("utf-8")
+        except (IndexError, UnicodeDecodeError):
+            raise ValueError("Invalid codec header.")
+        lengths = [length for length, count in enumerate(counts) for _ in range(count)]
+        # Only the lengths of a complete prefix code (or a lone symbol with an
+        # empty code word) describe a Huffman code.
+        complete = lengths == [0] or (0 not in lengths and lengths and
+                                      sum(1 << (max_length - length) for length in lengths) == 1 << max_length)
+        if len(symbols) != len(lengths) or len(set(symbols)) != len(symbols) or not complete:
+            raise ValueError("Invalid codec header.")
+
+        codec = cls.__new__(cls)
+        codec.code = HuffmanCodec._canonical_code(zip(symbols, lengths))
+        codec.root = HuffmanCodec._tree_from_code(codec.code)
+        codec._prepare_decoding()
+        return codec
+
+    def to_bytes(self) -> bytes:
+        """Serializes the codec as the code lengths of its symbols.
+
+        Canonical code words follow from the lengths alone, so the header is
+        the longest length, the number of symbols of each length, then the
+        symbols in canonical order as UTF-8, with every number a
+        variable-length integer. A text's header is a few dozen bytes.
+
+        Returns
+        -------
+        header : bytes
+            Serialized codec, for `from_bytes`.
+
+        Raises
+        ------
+        ValueError
+            If a source symbol is not a single character.
+        """
+        if any(len(symbol) != 1 for symbol in self.code):
+            raise ValueError("Only single-character symbols can be serialized.")
+        max_length = max(len(word) for word in self.code.values())
+        counts = [0] * (max_length + 1)
+        for word in self.code.values():
+            counts[len(word)] += 1
+        header = bytearray(_varint(max_length))
+        for count in counts:
+            header += _varint(count)
+        # `code` is built in canonical order.
+        header += "".join(self.code).encode("utf-8")
+        return bytes(header)
+
+    def _prepare_decoding(self):
+        # Code words keyed by (length, value), for decoding.
+        self._symbols = {(len(word), word.uint): symbol for symbol, word in self.code.items() if word}
+        self._tables = None  # Built on the first call to `decode`.
 
     def encode(self, source_data: str) -> Bits:
         """Encodes the given source data.
@@ -97,24 +183,121 @@ class HuffmanCodec:
         ValueError
             If encoded_data contains bits which could not be decoded.
         """
-        # TODO
-        # reference from: https://www.geeksforgeeks.org/huffman-decoding/
+        if self.root.is_leaf:
+            # A one-symbol alphabet has an empty code word, which cannot be
+            # told apart from no data at all.
+            if encoded_data:
+                raise ValueError("Could not decode.")
+            return ""
+        if self._tables is None:
+            self._tables = self._build_tables()
+        table, lookup_bits = self._tables
+
+        # Three bytes always hold a window of up to 17 bits at any bit
+        # offset; the zero padding keeps the last peeks in range.
+        data = encoded_data.tobytes() + bytes(3)
+        end = len(encoded_data)
         decoded_array = []
-        curr_node = self.root
+        append, from_bytes, mask = decoded_array.append, int.from_bytes, (1 << lookup_bits) - 1
+        position = 0
+        while position + lookup_bits <= end:
+            byte = position >> 3
+            window = from_bytes(data[byte:byte + 3], "big") >> (24 - lookup_bits - (position & 7))
+            text, consumed, subtable = table[window & mask]
+            if subtable is None:
+                append(text)
+                position += consumed
+                continue
+            # A code word longer than the window: continue in the tables
+            # for its prefix, one window of at most `width` bits at a time.
+            offset = position + lookup_bits
+            while subtable is not None:
+                width, entries = subtable
+                if offset + width > end:
+                    break
+                byte = offset >> 3
+                window = int.from_bytes(data[byte:byte + 3], "big") >> (24 - width - (offset & 7))
+                text, consumed, subtable = entries[window & ((1 << width) - 1)]
+                offset += width if subtable is not None else consumed
+            if subtable is not None:
+                break
+            append(text)
+            position = offset
+
+        # The last few bits are too short for a full window: walk them one
+        # bit at a time through the code words.
+        length = value = 0
+        for bit in encoded_data[position:]:
+            length, value = length + 1, value << 1 | bit
+            symbol = self._symbols.get((length, value))
+            if symbol is not None:
+                decoded_array.append(symbol)
+                length = value = 0
+        if length:
+            raise ValueError("Could not decode.")
+        return ''.join(decoded_array)
 
-        for data in encoded_data:
-            if data == 0:
-                curr_node = curr_node.left
+    def _build_tables(self, lookup_bits: int = LOOKUP_BITS) -> tuple[list, int]:
+        """Builds the lookup tables used by `decode`.
+
+        The primary table has an entry for every possible `lookup_bits`-bit
+        window. An entry holds the symbols of all the code words that fit
+        entirely in the window, read greedily, and the number of bits they
+        take. Windows that start with a longer code word instead point to a
+        secondary table for that prefix, which resolves the next bits the
+        same way, one symbol per entry.
+
+        Returns
+        -------
+        table : list[tuple[str, int, tuple | None]]
+            Primary table of (symbols, bits consumed, subtable) entries, where
+            a subtable is a (width, entries) pair.
+        lookup_bits : int
+            Width of the primary window.
+        """
+        longest = max(length for length, _ in self._symbols)
+        table = []
+        for window in range(1 << lookup_bits):
+            text, consumed = [], 0
+            while True:
+                symbol, length = self._match(window, lookup_bits, consumed)
+                if symbol is None:
+                    break
+                text.append(symbol)
+                consumed += length
+            subtable = None
+            if not text:
+                subtable = self._build_subtable(window, lookup_bits, min(lookup_bits, longest - lookup_bits))
+            table.append((''.join(text), consumed, subtable))
+        return table, lookup_bits
+
+    def _build_subtable(self, prefix: int, prefix_bits: int, width: int) -> tuple[int, list]:
+        """Secondary table for the code words that start with `prefix`."""
+        entries = []
+        longest = max(length for length, _ in self._symbols)
+        for window in range(1 << width):
+            bits = prefix << width | window
+            symbol, length = self._match(bits, prefix_bits + width, 0)
+            if symbol is not None:
+                entries.append((symbol, length - prefix_bits, None))
             else:
-                curr_node = curr_node.right
+                deeper = min(width, longest - prefix_bits - width)
+                entries.append(("", 0, self._build_subtable(bits, prefix_bits + width, deeper)))
+        return width, entries
 
-            if curr_node.is_leaf:
-                decoded_array.append(curr_node.symbol)
-                curr_node = self.root
+    def _match(self, bits: int, width: int, start: int) -> tuple[str | None, int]:
+        """Finds the code word at bit `start` of the `width`-bit integer `bits`.
 
-        if curr_node != self.root:
-            raise ValueError("Could not decode.")
-        return ''.join(decoded_array)
+        Returns the symbol and code word length, or (None, 0) if no code word
+        ends within the remaining bits.
+        """
+        value = 0
+        for length in range(1, width - start + 1):
+            value = value << 1 | bits >> (width - start - length) & 1
+            symbol = self._symbols.get((length, value))
+            if symbol is not None:
+                return symbol, length
+        return None, 0
 
     @staticmethod
     def _build_tree(frequency_map: dict[str, float]) -> TreeNode:
@@ -149,29 +332,79 @@ class HuffmanCodec:
         return huffman_tree[0]  # Root node of resulting tree.
 
     def _get_code(self) -> dict[str, Bits]:
-        """Returns the Huffman code represented by this tree.
+        """Returns the canonical Huffman code for this tree.
+
+        Only the depth of each leaf is taken from the tree; the code words
+        themselves are assigned by `_canonical_code`.
 
         Returns
         -------
         code : dict[str, Bits]
             Dictionary mapping source symbols to code words.
         """
-
-        # TODO
-        def traceback(node, path):
+        lengths = []
+        stack = [(self.root, 0)]
+        while stack:
+            node, depth = stack.pop()
             if node.is_leaf:
-                return {node.symbol: Bits(bin="0b" + path)}  # create a Bits object from a binary string representation
-            huffman_code = dict()  # required to return a dictionary mapping
-            # use the update method to update the code of the huffman code
-            # reference from: https://www.programiz.com/dsa/huffman-coding
-            # go left is 0, go right is 1 based on the concept of huffman code
-            if node.left:
-                huffman_code.update(traceback(node.left, path + '0'))
-            if node.right:
-                huffman_code.update(traceback(node.right, path + '1'))
-            return huffman_code
-
-        return traceback(self.root, "")
+                lengths.append((node.symbol, depth))
+            else:
+                stack.append((node.left, depth + 1))
+                stack.append((node.right, depth + 1))
+        return HuffmanCodec._canonical_code(lengths)
+
+    @staticmethod
+    def _canonical_code(lengths) -> dict[str, Bits]:
+        """Assigns canonical code words to (symbol, length) pairs.
+
+        Symbols are sorted by code length, then by symbol, and each takes the
+        next integer after its predecessor's code word, shifted left by the
+        difference in length. The result keeps that order.
+        """
+        code = {}
+        value = previous = 0
+        for symbol, length in sorted(lengths, key=lambda pair: (pair[1], pair[0])):
+            value <<= length - previous
+            code[symbol] = Bits(uint=value, length=length) if length else Bits()
+            value += 1
+            previous = length
+        return code
+
+    @staticmethod
+    def _tree_from_code(code: dict[str, Bits]) -> TreeNode:
+        """Builds the tree of a prefix code; weights are not known and set to 0."""
+        root = TreeNode(symbol="", weight=0)
+        for symbol, word in code.items():
+            node = root
+            for bit in word:
+                branch = "right" if bit else "left"
+                if getattr(node, branch) is None:
+                    setattr(node, branch, TreeNode(symbol="", weight=0))
+                node = getattr(node, branch)
+            node.symbol = symbol
+        return root
+
+
+def _varint(n: int) -> bytes:
+    """Little-endian base-128 encoding of a non-negative integer."""
+    out = bytearray()
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _read_varint(data: bytes, position: int) -> tuple[int, int]:
+    """Reads a `_varint` at `position`; returns it and the position after it."""
+    n = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        n |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            return n, position
 
 
 @total_ordering
@@ -113,3 +113,87 @@ def test_decoding_error():
     bad_encoding1 = Bits(bin="0b0") + huffman_encoding
     with pytest.raises(ValueError, match="Could not decode."):
         codec.decode(bad_encoding1)
+
+
+def fibonacci_frequencies(n):
+    frequencies = [1, 1]
+    while len(frequencies) < n:
+        frequencies.append(frequencies[-1] + frequencies[-2])
+    return {chr(ord("A") + i): f for i, f in enumerate(frequencies)}
+
+
+@pytest.mark.parametrize("symbols", [2, 14, 30, 40])
+def test_decode_long_code_words(symbols):
+    # Fibonacci weights give a maximally skewed tree, with code words far
+    # longer than the decoder's lookup window.
+    frequency_map = fibonacci_frequencies(symbols)
+    codec = huffman.HuffmanCodec(frequency_map)
+    text = "".join(sorted(frequency_map)) * 3 + "A" * 50 + "B" * 7
+
+    assert max(len(word) for word in codec.code.values()) == symbols - 1
+    assert codec.decode(codec.encode(text)) == text
+
+
+@pytest.mark.parametrize("cut", [1, 2, 11, 12, 13, 28])
+def test_decoding_error_long_codes(cut):
+    # A truncated code word has to be caught both inside and past the
+    # lookup window.
+    codec = huffman.HuffmanCodec(fibonacci_frequencies(30))
+    huffman_encoding = codec.encode("ABCDEFGHIJKLMNOPQRSTUVWXYZ" * 5)
+
+    with pytest.raises(ValueError, match="Could not decode."):
+        codec.decode(huffman_encoding + codec.code["A"][:cut])
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_canonical_code(text):
+    codec = huffman.HuffmanCodec(Counter(text))
+    words = sorted(codec.code.values(), key=lambda word: (len(word), word.uint))
+
+    # Code words of each length are consecutive integers, continuing from
+    # the last shorter code word.
+    for shorter, longer in zip(words, words[1:]):
+        assert longer.uint == (shorter.uint + 1) << (len(longer) - len(shorter))
+    assert words[0].uint == 0 and words[-1].all(1)
+
+
+@pytest.mark.parametrize("text", TEXTS + ["a"])
+def test_tree_matches_code(text):
+    codec = huffman.HuffmanCodec(Counter(text))
+    walked = {}
+    stack = [(codec.root, Bits())]
+    while stack:
+        node, word = stack.pop()
+        if node.is_leaf:
+            walked[node.symbol] = word
+        else:
+            stack.append((node.left, word + "0b0"))
+            stack.append((node.right, word + "0b1"))
+
+    assert walked == codec.code
+
+
+@pytest.mark.parametrize("text", TEXTS + ["aaab", "Größe ☃ 文字"])
+def test_serialization(text):
+    codec = huffman.HuffmanCodec(Counter(text))
+    header = codec.to_bytes()
+    restored = huffman.HuffmanCodec.from_bytes(header)
+
+    assert len(header) < 2 * len(codec.code) + 16
+    assert restored.code == codec.code
+    assert restored.decode(codec.encode(text)) == text
+
+
+@pytest.mark.parametrize("header", [b"", b"\x02\x00\x01", b"\x02\x00\x01\x03abcd", b"\x01\x00\x03abc",
+                                    b"\x02\x00\x01\x02aab", b"\x01\x00\x02\xff\xfe"])
+def test_deserialization_error(header):
+    with pytest.raises(ValueError, match="Invalid codec header."):
+        huffman.HuffmanCodec.from_bytes(header)
+
+
+def test_serialization_one_symbol():
+    codec = huffman.HuffmanCodec({"a": 1})
+    restored = huffman.HuffmanCodec.from_bytes(codec.to_bytes())
+
+    assert restored.code == codec.code == {"a": Bits()}
+    assert restored.decode(Bits()) == ""